@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tag venues with dog amenities found in their descriptions
+Builds one Aho-Corasick automaton over the amenity vocabulary and scans every description in a single pass
+"""
+
+import argparse
+import csv
+import logging
+import random
+import sys
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Amenity tag -> phrases that imply it (matched case-insensitively on word boundaries)
+AMENITY_VOCABULARY = {
+    'Water Bowls': [
+        'water bowl', 'water bowls', 'bowl of water', 'bowls of water', 'fresh water for dogs',
+        'water station', 'drinking water for dogs',
+    ],
+    'Dog Menu': [
+        'dog menu', 'doggy menu', 'doggie menu', 'canine menu', 'menu for dogs', 'pooch menu',
+        'puppuccino', 'puppuccinos', 'dogtail', 'dogtails', 'dog beer', 'dog ice cream',
+    ],
+    'Treats': [
+        'dog treat', 'dog treats', 'doggy treats', 'doggie treats', 'biscuits for dogs',
+        'dog biscuit', 'dog biscuits', 'treats for dogs', 'complimentary treats',
+    ],
+    # No bare 'garden', 'terrace' or 'courtyard': they turn up in addresses and names
+    # (Covent Garden, Bayswater Terrace, Courtyard by Marriott) far more often than as amenities
+    'Garden': [
+        'beer garden', 'beer gardens', 'pub garden', 'garden seating', 'garden area', 'walled garden',
+        'secret garden', 'courtyard garden', 'courtyard seating', 'patio', 'outdoor seating',
+        'outdoor area', 'outdoor terrace', 'roof terrace', 'rooftop terrace', 'rooftop bar',
+        'sun terrace', 'terrace seating',
+    ],
+    'Off-Lead Area': [
+        'off-lead', 'off lead', 'off-leash', 'off leash', 'dog park', 'enclosed field',
+        'secure field', 'dog run',
+    ],
+    'Dogs Allowed Inside': [
+        'dogs allowed inside', 'dogs welcome inside', 'dogs are welcome inside', 'dog-friendly bar',
+        'dogs allowed in the bar', 'dogs welcome in the bar', 'dogs welcome throughout',
+    ],
+    'Dog Beds': [
+        'dog bed', 'dog beds', 'dog blanket', 'dog blankets', 'pet bed', 'pet beds',
+    ],
+}
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class AmenityTagger:
+    def __init__(self, vocabulary=None):
+        self.vocabulary = vocabulary or AMENITY_VOCABULARY
+        # Tag order follows the vocabulary so output columns are stable run to run
+        self.tag_order = {tag: position for position, tag in enumerate(self.vocabulary)}
+        self._build()
+
+    def _build(self):
+        """Compile the vocabulary into a trie, then fold the fail links into a full transition table"""
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # state -> [(phrase length, tag)]
+
+        for tag, phrases in self.vocabulary.items():
+            for phrase in phrases:
+                phrase = phrase.lower()
+                state = 0
+                for char in phrase:
+                    next_state = self.goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self.goto)
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.output.append([])
+                        self.goto[state][char] = next_state
+                    state = next_state
+                self.output[state].append((len(phrase), tag))
+
+        # Breadth-first so every fail link points at an already-finished shallower state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        # Each state inherits its fail state's moves, so scanning never has to walk fail links.
+        # Characters outside the vocabulary's alphabet simply fall back to the root.
+        self.delta = [None] * len(self.goto)
+        self.delta[0] = dict(self.goto[0])
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            moves = dict(self.delta[self.fail[state]]) if state else {}
+            moves.update(self.goto[state])
+            self.delta[state] = moves
+            queue.extend(self.goto[state].values())
+
+    def tag(self, text):
+        """Return the amenity tags mentioned in text, in vocabulary order"""
+        if not text:
+            return []
+
+        text = text.lower()
+        delta, output = self.delta, self.output
+        found = set()
+        state = 0
+        length = len(text)
+
+        for end, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if not output[state]:
+                continue
+
+            for phrase_length, tag in output[state]:
+                if tag in found:
+                    continue
+                start = end - phrase_length + 1
+                # Whole words only, so 'patio' doesn't fire on 'patios' and 'dog bed' not on 'dog bedding'
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end + 1 < length and _is_word_char(text[end + 1]):
+                    continue
+                found.add(tag)
+
+        return sorted(found, key=self.tag_order.__getitem__)
+
+    def tag_row(self, row):
+        """Fill the GeoDirectory tag columns of a formatted row from its description fields"""
+        # service_1_description is a 100-character excerpt of post_content, only worth scanning on its own
+        tags = self.tag(row.get('post_content') or row.get('service_1_description'))
+        row['post_tags'] = ','.join(tags)
+        row['does_your_business_have_any_of_the_following'] = ','.join(tags)
+        return row
+
+
+def tag_csv(input_csv, output_csv, tagger=None):
+    """Stream a GeoDirectory CSV, filling the tag columns of every row"""
+    tagger = tagger or AmenityTagger()
+    tagged = 0
+
+    with open(input_csv, 'r', newline='', encoding='utf-8') as f_in, \
+            open(output_csv, 'w', newline='', encoding='utf-8') as f_out:
+        reader = csv.DictReader(f_in)
+        writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames)
+        writer.writeheader()
+
+        for row in reader:
+            tagger.tag_row(row)
+            if row['post_tags']:
+                tagged += 1
+            writer.writerow(row)
+
+    return tagged
+
+
+def benchmark(count=100000, seed=0):
+    """Time the tagger on synthetic descriptions shaped like the scraped ones"""
+    rng = random.Random(seed)
+    filler = (
+        'The venue serves contemporary British plates using locally-sourced seasonal ingredients '
+        'and welcomes well-behaved pets with their owners'
+    ).split()
+    phrases = [phrase for group in AMENITY_VOCABULARY.values() for phrase in group]
+
+    descriptions = []
+    for _ in range(count):
+        words = rng.choices(filler, k=rng.randint(30, 80))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        descriptions.append(' '.join(words))
+
+    tagger = AmenityTagger()
+    total_chars = sum(len(text) for text in descriptions)
+    start = time.perf_counter()
+    tagged = sum(1 for text in descriptions if tagger.tag(text))
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"Tagged {count} descriptions ({total_chars / 1e6:.1f}M chars) in {elapsed:.2f}s: "
+        f"{count / elapsed:,.0f} descriptions/s, {tagged} with at least one tag"
+    )
+    return elapsed
+
+
+def main():
+    """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Fill post_tags and amenity columns from venue descriptions')
+    parser.add_argument('input_csv', nargs='?', help='GeoDirectory CSV to tag')
+    parser.add_argument('output_csv', nargs='?', help='Where to write the tagged CSV')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Benchmark on N synthetic descriptions instead')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+
+    if not args.input_csv or not args.output_csv:
+        parser.error('input_csv and output_csv are required unless --benchmark is given')
+
+    tagged = tag_csv(args.input_csv, args.output_csv)
+    logger.info(f"🏷️  Tagged {tagged} venues -> {args.output_csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Compact bringfido_progress snapshots into one deduplicated venue dataset
+Every snapshot is stream-parsed and records are merged in an on-disk table, so memory stays flat
+however many gigabytes of overlapping progress files have piled up
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024 * 1024
+INSERT_BATCH_SIZE = 1000
+
+# A venue record is a few KB; anything that still won't parse after this much text is malformed,
+# and giving up there keeps one bad record from pulling the rest of a snapshot into memory
+MAX_RECORD_SIZE = 4 * 1024 * 1024
+
+# Hand-entered venues are corrections, so manual files rank above every snapshot whatever their mtime
+MANUAL_TAKEN = float('inf')
+
+# save_progress names files bringfido_progress_<suffix>_<YYYYmmdd_HHMMSS>.json
+SNAPSHOT_TIMESTAMP = re.compile(r'_(\d{8}_\d{6})\.json$')
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK_SIZE, max_record_size=MAX_RECORD_SIZE):
+    """Yield the elements of a top-level JSON array one at a time without loading the whole file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace and separators, refilling the buffer as needed
+            while True:
+                while position < len(buffer) and buffer[position] in _WHITESPACE:
+                    position += 1
+                if position < len(buffer) or eof:
+                    break
+                chunk = f.read(chunk_size)
+                buffer, position = buffer[position:] + chunk, 0
+                eof = not chunk
+
+            if position >= len(buffer):
+                if started:
+                    raise ValueError(f"{path}: unexpected end of file inside array")
+                return
+
+            char = buffer[position]
+            if not started:
+                if char != '[':
+                    raise ValueError(f"{path}: expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                position += 1
+                continue
+
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise
+                if len(buffer) - position > max_record_size:
+                    raise ValueError(f"{path}: no valid record within {max_record_size} bytes ({e})") from e
+                # The element runs past the end of the buffer - read more and try again
+                chunk = f.read(chunk_size)
+                buffer, position = buffer[position:] + chunk, 0
+                eof = not chunk
+                continue
+
+            # raw_decode can stop early on a number split across chunks; only trust it with data after it
+            if end == len(buffer) and not eof:
+                chunk = f.read(chunk_size)
+                buffer, position = buffer[position:] + chunk, 0
+                eof = not chunk
+                continue
+
+            yield value
+            position = end
+
+
+def iter_json_lines(path):
+    """Yield one record per non-blank line of a JSONL file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
+
+
+def iter_records(path):
+    """Records from either a JSON array file or a JSONL file"""
+    if path.endswith('.jsonl'):
+        return iter_json_lines(path)
+    return iter_json_array(path)
+
+
+def snapshot_time(path):
+    """When a snapshot was taken - from the save_progress filename, else the file's mtime"""
+    match = SNAPSHOT_TIMESTAMP.search(os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+    return os.path.getmtime(path)
+
+
+class VenueTable:
+    """On-disk table keeping only the newest record seen for each venue URL"""
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute('PRAGMA journal_mode=OFF')
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS venues ('
+            ' url TEXT PRIMARY KEY, taken REAL NOT NULL, sequence INTEGER NOT NULL, record TEXT NOT NULL)'
+        )
+        self.batch = []
+
+    def add(self, url, taken, sequence, record):
+        self.batch.append((url, taken, sequence, json.dumps(record, ensure_ascii=False)))
+        if len(self.batch) >= INSERT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        # Later snapshot wins; on the same snapshot time (or between manual files) the record read last wins
+        self.connection.executemany(
+            'INSERT INTO venues (url, taken, sequence, record) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(url) DO UPDATE SET taken = excluded.taken, sequence = excluded.sequence, '
+            'record = excluded.record '
+            'WHERE excluded.taken > venues.taken '
+            'OR (excluded.taken = venues.taken AND excluded.sequence > venues.sequence)',
+            self.batch,
+        )
+        self.connection.commit()
+        self.batch = []
+
+    def count(self):
+        self.flush()
+        return self.connection.execute('SELECT COUNT(*) FROM venues').fetchone()[0]
+
+    def records(self):
+        """Newest records in the order each venue was first seen"""
+        self.flush()
+        for (record,) in self.connection.execute('SELECT record FROM venues ORDER BY rowid'):
+            yield record
+
+    def close(self):
+        self.connection.close()
+
+
+def iter_compacted(snapshot_paths, manual_paths=(), work_dir=None):
+    """Yield the newest record for each venue URL, as JSON text, in the order each venue was first seen.
+    Manual entry files always win over snapshots; among them the later file (and line) wins."""
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        table = VenueTable(os.path.join(tmp_dir, 'venues.sqlite'))
+        seen = skipped = 0
+        sequence = 0  # position across all sources, so ties on taken go to whichever was read last
+
+        try:
+            # Oldest first so first-seen order follows the scrape order
+            sources = [(path, snapshot_time(path)) for path in sorted(snapshot_paths, key=snapshot_time)]
+            sources += [(path, MANUAL_TAKEN) for path in manual_paths]
+            for path, taken in sources:
+                file_records = 0
+                try:
+                    for record in iter_records(path):
+                        url = record.get('url') if isinstance(record, dict) else None
+                        if not url:
+                            skipped += 1
+                            continue
+                        table.add(url, taken, sequence, record)
+                        sequence += 1
+                        file_records += 1
+                except (ValueError, OSError) as e:
+                    # A snapshot cut off mid-write still contributes everything before the damage
+                    logger.warning(f"Stopped reading {path} early: {e}")
+                seen += file_records
+                logger.info(f"Read {file_records} records from {path}")
+
+            logger.info(f"Compacted {seen} records into {table.count()} unique venues ({skipped} without a URL skipped)")
+            yield from table.records()
+        finally:
+            table.close()
+
+
+def compact(snapshot_paths, output_path, manual_paths=(), work_dir=None):
+    """Merge snapshots (and manual entry files) into one JSON array of unique venues"""
+    unique = 0
+    tmp_output = f"{output_path}.tmp"
+    with open(tmp_output, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in iter_compacted(snapshot_paths, manual_paths, work_dir):
+            f.write(',\n' if unique else '\n')
+            f.write(record)
+            unique += 1
+        f.write('\n]\n')
+    os.replace(tmp_output, output_path)
+    return unique
+
+
+def main():
+    """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Merge bringfido_progress snapshots into one deduplicated dataset')
+    parser.add_argument('snapshots', nargs='*', help='Snapshot files (default: bringfido_progress_*.json in --dir)')
+    parser.add_argument('--dir', default='.', help='Directory to search for snapshots when none are listed')
+    parser.add_argument('--manual', action='append', default=[], metavar='FILE',
+                        help='Hand-entered venues as JSON or JSONL (repeatable)')
+    parser.add_argument('-o', '--output', default='bringfido_compacted.json', help='Where to write the merged dataset')
+    args = parser.parse_args()
+
+    snapshots = args.snapshots or glob.glob(os.path.join(args.dir, 'bringfido_progress_*.json'))
+    if not snapshots and not args.manual:
+        logger.error("No snapshots or manual entry files found")
+        return 1
+
+    compact(snapshots, args.output, args.manual, work_dir=os.path.dirname(os.path.abspath(args.output)))
+    logger.info(f"📦 Dataset written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Diff two BringFido production runs and write delta import files
+Compares rows by official_review_url so only added/changed/removed venues get re-imported
+"""
+
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import sys
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Stable key shared by every run - the BringFido page URL
+KEY_FIELD = 'official_review_url'
+
+# Columns that change on every run even when the venue itself hasn't
+VOLATILE_FIELDS = ('ID', 'post_date', 'post_modified')
+
+
+def row_digest(row, fieldnames):
+    """Hash the non-volatile columns of a row by name, so reordering the columns changes nothing"""
+    digest = hashlib.blake2b(digest_size=16)
+    for field in sorted(fieldnames):
+        if field in VOLATILE_FIELDS:
+            continue
+        digest.update(field.encode('utf-8'))
+        digest.update(b'\x1e')
+        digest.update((row.get(field) or '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.digest()
+
+
+def load_digests(csv_path):
+    """Read a run once, keeping only key -> digest so memory stays small"""
+    digests = {}
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        for row in reader:
+            key = (row.get(KEY_FIELD) or '').strip()
+            if not key:
+                continue
+            # First row wins, the same rule the new run follows, so a repeat can't fake a change
+            if key in digests:
+                logger.warning(f"Skipping duplicate {KEY_FIELD} in {csv_path}: {key}")
+                continue
+            digests[key] = row_digest(row, fieldnames)
+    return digests, fieldnames
+
+
+def diff_runs(old_csv, new_csv, output_dir, prefix='bringfido_delta'):
+    """Stream the new run against the old one and write added/changed/removed CSVs"""
+    old_digests, old_fieldnames = load_digests(old_csv)
+    logger.info(f"Loaded {len(old_digests)} keyed rows from {old_csv}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        name: os.path.join(output_dir, f"{prefix}_{name}.csv")
+        for name in ('added', 'changed', 'removed')
+    }
+    counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'duplicate': 0}
+    seen_keys = set()
+
+    with open(new_csv, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or old_fieldnames
+
+        with open(paths['added'], 'w', newline='', encoding='utf-8') as added_f, \
+                open(paths['changed'], 'w', newline='', encoding='utf-8') as changed_f:
+            added_writer = csv.DictWriter(added_f, fieldnames=fieldnames)
+            changed_writer = csv.DictWriter(changed_f, fieldnames=fieldnames)
+            added_writer.writeheader()
+            changed_writer.writeheader()
+
+            for row in reader:
+                key = (row.get(KEY_FIELD) or '').strip()
+                if not key:
+                    continue
+                # A second row for the same venue would otherwise look brand new once the first popped its digest
+                if key in seen_keys:
+                    logger.warning(f"Skipping duplicate {KEY_FIELD} in {new_csv}: {key}")
+                    counts['duplicate'] += 1
+                    continue
+                seen_keys.add(key)
+
+                old_digest = old_digests.pop(key, None)
+                if old_digest is None:
+                    added_writer.writerow(row)
+                    counts['added'] += 1
+                elif old_digest != row_digest(row, fieldnames):
+                    changed_writer.writerow(row)
+                    counts['changed'] += 1
+                else:
+                    counts['unchanged'] += 1
+
+    # Whatever is left in old_digests never showed up in the new run.
+    # Only those rows are pulled back out of the old file.
+    with open(old_csv, 'r', newline='', encoding='utf-8') as f, \
+            open(paths['removed'], 'w', newline='', encoding='utf-8') as removed_f:
+        reader = csv.DictReader(f)
+        removed_writer = csv.DictWriter(removed_f, fieldnames=fieldnames, extrasaction='ignore')
+        removed_writer.writeheader()
+        if old_digests:
+            for row in reader:
+                key = (row.get(KEY_FIELD) or '').strip()
+                if key in old_digests:
+                    removed_writer.writerow(row)
+                    counts['removed'] += 1
+                    del old_digests[key]
+
+    logger.info(
+        f"Diff complete: {counts['added']} added, {counts['changed']} changed, "
+        f"{counts['removed']} removed, {counts['unchanged']} unchanged, {counts['duplicate']} duplicates skipped"
+    )
+    return counts, paths
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('old_csv', help='Previous bringfido_PRODUCTION_COMPLETE_*.csv')
+    parser.add_argument('new_csv', help='Latest bringfido_PRODUCTION_COMPLETE_*.csv')
+    parser.add_argument('-o', '--output-dir', default='.', help='Where to write the delta CSVs')
+    parser.add_argument('--prefix', default='bringfido_delta', help='Filename prefix for the delta CSVs')
+    args = parser.parse_args()
+
+    try:
+        counts, paths = diff_runs(args.old_csv, args.new_csv, args.output_dir, args.prefix)
+    except FileNotFoundError as e:
+        logger.error(f"Could not open run: {e}")
+        return 1
+
+    for name, path in paths.items():
+        logger.info(f"📄 {name}: {counts[name]} rows -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+London Dog-Friendly data tools - one entry point for crawling and every offline step
+Each subcommand imports only what it needs, so offline jobs never load the browser stack
+
+    python3 dogfriendly.py crawl                       # full BringFido scrape (needs Playwright)
+    python3 dogfriendly.py format venues.json          # venues JSON/JSONL -> GeoDirectory CSV
+    python3 dogfriendly.py merge                       # compact bringfido_progress_*.json snapshots
+    python3 dogfriendly.py diff old.csv new.csv        # added/changed/removed delta CSVs
+    python3 dogfriendly.py export big.csv              # import-sized CSV chunks
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from package_import import DEFAULT_MAX_CHUNK_BYTES, DEFAULT_ROWS_PER_CHUNK
+from paths import DATA_DIR_ENV, MANUAL_VENUES_FILE, default_data_dir
+
+logger = logging.getLogger('dogfriendly')
+
+
+def run_crawl(args):
+    try:
+        import playwright  # noqa: F401
+    except ImportError:
+        logger.error("crawl needs Playwright: pip install playwright && playwright install chromium")
+        return 1
+
+    from scrape_bringfido_production import BringFidoProductionScraper
+
+    profiler = None
+    if args.profile:
+        from venue_profiler import VenueProfiler
+
+        profile_dir = args.profile_dir or os.path.join(args.data_dir, 'profile')
+        profiler = VenueProfiler(profile_dir, args.slow_threshold, args.keep_traces)
+
+    scraper = BringFidoProductionScraper(args.data_dir, args.existing_csv, args.id_map, profiler)
+    scraper.run_production_scrape()
+    return 0
+
+
+def run_format(args):
+    import json
+
+    from compact_progress import iter_compacted
+    from scrape_bringfido_production import BringFidoProductionScraper
+
+    # Overlapping snapshots repeat venues, so keep only the newest record per URL
+    work_dir = os.path.dirname(os.path.abspath(args.inputs[0]))
+    venues = [json.loads(record) for record in iter_compacted(args.inputs, work_dir=work_dir)]
+    if not venues:
+        logger.error("No venues found in the input files")
+        return 1
+
+    scraper = BringFidoProductionScraper(args.data_dir, args.existing_csv, args.id_map)
+    scraper.save_dataset(venues, combined=args.combined)
+    return 0
+
+
+def run_merge(args):
+    import glob
+
+    from compact_progress import compact
+
+    snapshots = args.snapshots or glob.glob(os.path.join(args.data_dir, 'bringfido_progress_*.json'))
+    manual = args.manual if args.manual is not None else [MANUAL_VENUES_FILE]
+    output = args.output or os.path.join(args.data_dir, 'bringfido_compacted.json')
+    if not snapshots and not manual:
+        logger.error("No snapshots or manual entry files found")
+        return 1
+
+    compact(snapshots, output, manual, work_dir=os.path.dirname(os.path.abspath(output)))
+    logger.info(f"📦 Dataset written to {output}")
+    return 0
+
+
+def run_diff(args):
+    from diff_runs import diff_runs
+
+    counts, paths = diff_runs(args.old_csv, args.new_csv, args.output_dir or args.data_dir, args.prefix)
+    for name, path in paths.items():
+        logger.info(f"📄 {name}: {counts[name]} rows -> {path}")
+    return 0
+
+
+def run_export(args):
+    from package_import import package_csv
+
+    output_dir = args.output_dir or os.path.join(args.data_dir, 'import_chunks')
+    for chunk_path in package_csv(args.input_csv, output_dir, args.rows, args.max_bytes, args.prefix):
+        logger.info(f"📦 {chunk_path}")
+    return 0
+
+
+def build_parser():
+    # Only cheap modules (package_import is csv/io/os) are imported for defaults, so --help stays fast
+    parser = argparse.ArgumentParser(description='London Dog-Friendly data tools')
+    parser.add_argument('--data-dir', default=default_data_dir(),
+                        help=f'Directory for inputs and outputs (default: ${DATA_DIR_ENV} or the current directory)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Debug logging')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    crawl_parser = subparsers.add_parser('crawl', help='Scrape every BringFido London venue (needs Playwright)')
+    crawl_parser.add_argument('--existing-csv', help='Existing GeoDirectory export (default: in --data-dir)')
+    crawl_parser.add_argument('--id-map', help='Persistent venue ID map (default: in --data-dir)')
+    crawl_parser.add_argument('--profile', action='store_true',
+                              help='Profile the run and keep Playwright traces of the slowest venues')
+    crawl_parser.add_argument('--profile-dir', help='Where to write traces and the report (default: profile in --data-dir)')
+    crawl_parser.add_argument('--slow-threshold', type=float, default=20.0,
+                              help='Seconds after which a venue counts as slow (default: 20)')
+    crawl_parser.add_argument('--keep-traces', type=int, default=10, help='Traces kept for the slowest N venues')
+    crawl_parser.set_defaults(handler=run_crawl)
+
+    format_parser = subparsers.add_parser('format', help='Turn scraped venue JSON/JSONL into a GeoDirectory CSV')
+    format_parser.add_argument('inputs', nargs='+',
+                               help='Venue files (snapshots, merge output, JSONL); newest record per URL wins')
+    format_parser.add_argument('--existing-csv', help='Existing GeoDirectory export (default: in --data-dir)')
+    format_parser.add_argument('--id-map', help='Persistent venue ID map (default: in --data-dir)')
+    format_parser.add_argument('--combined', action='store_true', help='Also write the MEGA combined dataset')
+    format_parser.set_defaults(handler=run_format)
+
+    merge_parser = subparsers.add_parser('merge', help='Compact progress snapshots into one deduplicated dataset')
+    merge_parser.add_argument('snapshots', nargs='*', help='Snapshot files (default: bringfido_progress_*.json in --data-dir)')
+    merge_parser.add_argument('--manual', action='append', metavar='FILE',
+                              help='Hand-entered venues as JSON or JSONL (default: manual_venues.jsonl)')
+    merge_parser.add_argument('-o', '--output', help='Merged dataset path (default: bringfido_compacted.json in --data-dir)')
+    merge_parser.set_defaults(handler=run_merge)
+
+    diff_parser = subparsers.add_parser('diff', help='Write added/changed/removed CSVs between two runs')
+    diff_parser.add_argument('old_csv', help='Previous production CSV')
+    diff_parser.add_argument('new_csv', help='Latest production CSV')
+    diff_parser.add_argument('-o', '--output-dir', help='Where to write the delta CSVs (default: --data-dir)')
+    diff_parser.add_argument('--prefix', default='bringfido_delta', help='Filename prefix for the delta CSVs')
+    diff_parser.set_defaults(handler=run_diff)
+
+    export_parser = subparsers.add_parser('export', help='Split a CSV into import-sized chunks')
+    export_parser.add_argument('input_csv', help='GeoDirectory CSV to split')
+    export_parser.add_argument('-o', '--output-dir', help='Where to write the chunks (default: import_chunks in --data-dir)')
+    export_parser.add_argument('--rows', type=int, default=DEFAULT_ROWS_PER_CHUNK, help='Maximum rows per chunk')
+    export_parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_CHUNK_BYTES, help='Maximum bytes per chunk')
+    export_parser.add_argument('--prefix', help='Chunk filename prefix (defaults to the input filename)')
+    export_parser.set_defaults(handler=run_export)
+
+    return parser
+
+
+def main(argv=None):
+    """Main function"""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        return args.handler(args)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"{args.command} failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
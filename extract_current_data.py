@@ -6,142 +6,33 @@ Based on the data we can see from the browser
 
 import csv
 import json
+import os
 from datetime import datetime
 
-def create_restaurant_data():
-    """Create restaurant data from what we observed in the browser"""
+from amenity_tagger import AmenityTagger
+from compact_progress import iter_json_lines
+from id_allocator import IdAllocator, combine_with_export
+from paths import MANUAL_VENUES_FILE, default_data_dir, existing_csv_path, id_map_path
+
+def create_restaurant_data(manual_path=MANUAL_VENUES_FILE):
+    """Load the restaurant data we observed in the browser from the manual entries file"""
     
-    # Data we extracted from the browser session
-    restaurants = [
-        {
-            'name': 'Smith and Whistle',
-            'address': 'Sheraton Grand London Park Lane, Piccadilly, Mayfair, London, UK W1J 7BX',
-            'phone': '+44 2074996321',
-            'email': 'smithandwhistle.parklane@sheraton.com',
-            'website': 'https://www.smithandwhistle.com/dog-friendly-bar',
-            'description': 'The Smith and Whistle is a cocktail bar themed around vintage detective novels and renowned for being one of the dog-friendliest bars in London. They proudly offer the city\'s first permanent drinks list created entirely for canine consumption. Bring Fido for a night out to enjoy a range of \'Dogtails\' including Bubbly Bow Wow or a Poochie Colada. Their food menu focuses on contemporary British plates using locally-sourced, seasonal ingredients.',
-            'latitude': '51.5049266',
-            'longitude': '-0.1469807',
-            'rating': '5.0',
-            'bringfido_id': '76703'
-        },
-        {
-            'name': 'The Three Stags',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Traditional British pub welcoming dogs',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '548'
-        },
-        {
-            'name': 'The Lord Palmerston',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Dog-friendly British pub',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '9977'
-        },
-        {
-            'name': 'BrewDog Canary Wharf',
-            'address': 'Canary Wharf, London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Modern craft beer bar with dog-friendly policy',
-            'latitude': '',
-            'longitude': '',  
-            'rating': '',
-            'bringfido_id': '81790'
-        },
-        {
-            'name': 'Greenwich Tavern',
-            'address': 'Greenwich, London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Traditional tavern welcoming dogs',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '15142'
-        },
-        {
-            'name': 'Donostia',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Spanish restaurant with outdoor dog-friendly seating',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '12462'
-        },
-        {
-            'name': 'Gordon Ramsay Street Pizza',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Pizza restaurant with dog-friendly outdoor area',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '82176'
-        },
-        {
-            'name': 'Yurt Cafe',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Unique cafe experience welcoming dogs',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '70037'
-        },
-        {
-            'name': 'Gotto Trattoria',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Italian restaurant with dog-friendly outdoor seating',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '81996'
-        },
-        {
-            'name': 'Unity Diner',
-            'address': 'London, Greater London, United Kingdom',
-            'phone': '',
-            'email': '',
-            'website': '',
-            'description': 'Plant-based diner welcoming dogs',
-            'latitude': '',
-            'longitude': '',
-            'rating': '',
-            'bringfido_id': '79323'
-        }
-    ]
+    # Hand-entered venues live in manual_venues.jsonl, one JSON object per line
+    restaurants = list(iter_json_lines(manual_path))
     
     return restaurants
 
-def format_for_csv(restaurants_data):
+def format_for_csv(restaurants_data, id_allocator=None):
     """Format restaurant data to match existing CSV structure"""
     formatted_data = []
+    amenity_tagger = AmenityTagger()
     
     for i, restaurant in enumerate(restaurants_data, start=6001):
+        review_url = f'https://www.bringfido.ca/restaurant/{restaurant.get("bringfido_id", "")}'
+        
+        # Stable per-URL ID when an allocator is available
+        if id_allocator is not None:
+            i = id_allocator.allocate(review_url)
         
         # Parse address for location components  
         address_parts = restaurant.get('address', '').split(',')
@@ -190,7 +81,7 @@ def format_for_csv(restaurants_data):
             'claimed': 0,
             'facebook': '',
             'instagram': '',
-            'official_review_url': f'https://www.bringfido.ca/restaurant/{restaurant.get("bringfido_id", "")}',
+            'official_review_url': review_url,
             'tiktok': '',
             'cf1': '',
             'service_2_description': '',
@@ -207,25 +98,32 @@ def format_for_csv(restaurants_data):
             'post_images': ''
         }
         
+        # Fill post_tags and the amenities column from the description
+        amenity_tagger.tag_row(formatted_restaurant)
+        
         formatted_data.append(formatted_restaurant)
     
     return formatted_data
 
-def main():
+def main(output_dir=None):
     """Main function to create CSV file"""
+    output_dir = output_dir or default_data_dir()
     try:
         # Get restaurant data
         restaurants = create_restaurant_data()
         print(f"Processing {len(restaurants)} restaurants...")
         
-        # Format data for CSV
-        formatted_data = format_for_csv(restaurants)
+        # Get field names from existing CSV structure
+        existing_csv = existing_csv_path(output_dir)
         
-        # Create output filename
-        output_file = f"/Users/shahed.miah/Projects/Dog Friendly Research/bringfido_restaurants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        # Format data for CSV, sharing the scraper's ID map so IDs never collide
+        id_allocator = IdAllocator(id_map_path(output_dir))
+        id_allocator.reserve_from_csv(existing_csv)
+        formatted_data = format_for_csv(restaurants, id_allocator)
+        id_allocator.save()
         
-        # Get field names from existing CSV structure
-        existing_csv = '/Users/shahed.miah/Projects/Dog Friendly Research/gd_place_2508250852_561054b5 - gd_place_2508250852_561054b5.csv.csv'
+        # Create output filename
+        output_file = os.path.join(output_dir, f"bringfido_restaurants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
         
         try:
             with open(existing_csv, 'r', encoding='utf-8') as f:
@@ -246,7 +144,7 @@ def main():
         
         # Also create a combined file with existing data
         try:
-            combined_file = f"/Users/shahed.miah/Projects/Dog Friendly Research/combined_dog_friendly_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            combined_file = os.path.join(output_dir, f"combined_dog_friendly_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
             
             # Read existing data
             existing_data = []
@@ -254,8 +152,8 @@ def main():
                 reader = csv.DictReader(f)
                 existing_data = list(reader)
             
-            # Combine with new data
-            all_data = existing_data + formatted_data
+            # Combine with new data; a restaurant already in the export is replaced, not repeated
+            all_data = combine_with_export(existing_data, formatted_data)
             
             # Write combined file
             with open(combined_file, 'w', newline='', encoding='utf-8') as f:
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Persistent GeoDirectory ID allocator
+Maps each venue's source URL to the same ID on every run and never reuses an ID already in the export
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# First ID handed out when nothing else is known - matches the old format_for_csv offset
+DEFAULT_START_ID = 8000
+
+
+class IdAllocator:
+    def __init__(self, state_path, start_id=DEFAULT_START_ID):
+        self.state_path = state_path
+        self.start_id = start_id
+        self.ids = {}          # source URL -> ID
+        self.reserved = set()  # IDs owned by rows we didn't allocate (e.g. the existing export)
+        self.used = set()      # every ID above, kept together for O(1) collision checks
+        self.owners = {}       # ID -> source URL, the reverse of self.ids
+        self.next_id = start_id
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load the URL -> ID map from disk if a previous run saved one"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        self.ids = {url: int(venue_id) for url, venue_id in state.get('ids', {}).items()}
+        self.reserved = {int(venue_id) for venue_id in state.get('reserved', [])}
+        self.used = self.reserved.union(self.ids.values())
+        self.owners = {venue_id: url for url, venue_id in self.ids.items()}
+        self.next_id = max(int(state.get('next_id', self.start_id)), self.start_id)
+        logger.info(f"Loaded {len(self.ids)} stable IDs from {self.state_path}")
+
+    def save(self):
+        """Write the map atomically so a crash can't leave a half-written file"""
+        if not self.dirty or not self.state_path:
+            return
+
+        state = {
+            'next_id': self.next_id,
+            'reserved': sorted(self.reserved),
+            'ids': self.ids,
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+        self.dirty = False
+        logger.info(f"Saved {len(self.ids)} stable IDs to {self.state_path}")
+
+    def reserve_from_csv(self, csv_path, url_field='official_review_url'):
+        """Reserve every ID in an existing export, adopting the export's ID for any row with a source URL"""
+        try:
+            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        venue_id = int(row.get('ID') or '')
+                    except ValueError:
+                        continue
+
+                    url = (row.get(url_field) or '').strip()
+
+                    # The export is authoritative: an ID it uses belongs to that row, so any other
+                    # URL we had mapped to it must move to a fresh ID
+                    owner = self.owners.get(venue_id)
+                    if owner is not None and owner != url:
+                        logger.warning(f"ID {venue_id} is taken in {csv_path}; {owner} will get a new ID")
+                        del self.ids[owner]
+                        del self.owners[venue_id]
+                        self.dirty = True
+
+                    # And a venue already in the export keeps the export's ID, so it isn't imported twice
+                    if url and self.ids.get(url) != venue_id:
+                        if url in self.ids:
+                            logger.warning(f"{url} is ID {venue_id} in {csv_path}, not {self.ids[url]}; using {venue_id}")
+                            del self.owners[self.ids[url]]
+                        self.ids[url] = venue_id
+                        self.owners[venue_id] = url
+                        self.used.add(venue_id)
+                        self.dirty = True
+
+                    if venue_id not in self.reserved:
+                        self.reserved.add(venue_id)
+                        self.used.add(venue_id)
+                        self.dirty = True
+        except FileNotFoundError:
+            logger.warning(f"Existing export not found, no IDs reserved: {csv_path}")
+
+    def allocate(self, url):
+        """Return the stable ID for a source URL, allocating a fresh one the first time it's seen"""
+        url = (url or '').strip()
+        if url and url in self.ids:
+            return self.ids[url]
+
+        while self.next_id in self.used:
+            self.next_id += 1
+
+        venue_id = self.next_id
+        self.next_id += 1
+        self.used.add(venue_id)
+        if url:
+            self.ids[url] = venue_id
+            self.owners[venue_id] = url
+        else:
+            # No URL means it can't be stable, but it still must not collide later
+            self.reserved.add(venue_id)
+        self.dirty = True
+        return venue_id
+
+
+def combine_with_export(existing_rows, new_rows):
+    """Existing export rows followed by new rows, where a new row replaces the export row with its ID"""
+    # reserve_from_csv hands a venue already in the export its export ID, so both lists can hold it
+    new_ids = {str(row.get('ID', '')).strip() for row in new_rows}
+    kept = [row for row in existing_rows if str(row.get('ID', '')).strip() not in new_ids]
+    replaced = len(existing_rows) - len(kept)
+    if replaced:
+        logger.info(f"{replaced} existing rows replaced by their newly scraped versions")
+    return kept + list(new_rows)
+
+
+def main():
+    """Show or seed the ID map"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Seed or inspect the persistent venue ID map')
+    parser.add_argument('state_path', help='JSON file holding the URL -> ID map')
+    parser.add_argument('--reserve', action='append', default=[], metavar='CSV',
+                        help='Existing GeoDirectory export whose IDs must never be reused (repeatable)')
+    args = parser.parse_args()
+
+    allocator = IdAllocator(args.state_path)
+    for csv_path in args.reserve:
+        allocator.reserve_from_csv(csv_path)
+    allocator.save()
+
+    logger.info(f"{len(allocator.ids)} URLs mapped, {len(allocator.reserved)} IDs reserved, next ID {allocator.next_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Download, dedupe and thumbnail venue images, then fill post_images
+Images are fetched with a bounded pool of keep-alive connections, stored once per content hash,
+and resized in a process pool so tens of thousands of photos never get downloaded twice
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from urllib.parse import urljoin, urlsplit
+
+# http.client and concurrent.futures are imported where they're used, so importing this module
+# for its helpers doesn't pull in the HTTP/email stack
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (compatible; LondonDogFriendlyBot/1.0)'
+MAX_IMAGE_BYTES = 15 * 1024 * 1024
+MAX_REDIRECTS = 5
+DEFAULT_WORKERS = 8
+DEFAULT_THUMBNAIL_SIZE = 800
+
+# Downloads between url_index.json checkpoints
+SAVE_EVERY = 500
+
+# Maximum images kept per venue listing
+MAX_IMAGES_PER_VENUE = 8
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+    'image/avif': '.avif',
+}
+
+
+def format_post_images(image_urls):
+    """Render image URLs in GeoDirectory's post_images format (url|attachment id|title|caption joined by ::)"""
+    return '::'.join(f"{url}|||" for url in image_urls[:MAX_IMAGES_PER_VENUE])
+
+
+class PooledHttpClient:
+    """Keeps one keep-alive connection per host per worker thread"""
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self, scheme, netloc):
+        import http.client
+
+        pool = getattr(self._local, 'pool', None)
+        if pool is None:
+            pool = self._local.pool = {}
+        key = (scheme, netloc)
+        connection = pool.get(key)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connection = pool[key] = connection_class(netloc, timeout=self.timeout)
+        return connection
+
+    def _drop(self, scheme, netloc):
+        connection = self._local.pool.pop((scheme, netloc), None)
+        if connection is not None:
+            connection.close()
+
+    def get(self, url):
+        """Fetch url, following redirects; returns (body bytes, content type)"""
+        import http.client
+
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ('http', 'https'):
+                raise ValueError(f"Unsupported image URL: {url}")
+            path = parts.path or '/'
+            if parts.query:
+                path = f"{path}?{parts.query}"
+
+            # A pooled connection may have been closed by the server; retry once on a fresh one
+            for attempt in range(2):
+                connection = self._connection(parts.scheme, parts.netloc)
+                try:
+                    connection.request('GET', path, headers={'User-Agent': USER_AGENT, 'Accept': 'image/*'})
+                    response = connection.getresponse()
+                    body = response.read(MAX_IMAGE_BYTES + 1)
+                    break
+                except (http.client.HTTPException, ConnectionError):
+                    self._drop(parts.scheme, parts.netloc)
+                    if attempt:
+                        raise
+
+            if response.will_close or len(body) > MAX_IMAGE_BYTES:
+                self._drop(parts.scheme, parts.netloc)
+
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader('Location')
+                if not location:
+                    raise ValueError(f"Redirect without Location from {url}")
+                url = urljoin(url, location)
+                continue
+            if response.status != 200:
+                raise ValueError(f"HTTP {response.status} for {url}")
+            if len(body) > MAX_IMAGE_BYTES:
+                raise ValueError(f"Image larger than {MAX_IMAGE_BYTES} bytes: {url}")
+            return body, (response.getheader('Content-Type') or '').split(';')[0].strip().lower()
+
+        raise ValueError(f"Too many redirects for {url}")
+
+
+class ImageStore:
+    """Content-addressed image files plus a URL -> hash index so known URLs are never fetched again"""
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, 'url_index.json')
+        self.url_index = {}  # source URL -> {'sha256': ..., 'ext': ...}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.url_index = json.load(f)
+
+    def original_path(self, digest, ext):
+        return os.path.join(self.root, 'originals', digest[:2], f"{digest}{ext}")
+
+    def thumbnail_path(self, digest):
+        return os.path.join(self.root, 'thumbs', digest[:2], f"{digest}.jpg")
+
+    def relative_thumbnail_path(self, digest):
+        return f"thumbs/{digest[:2]}/{digest}.jpg"
+
+    def lookup(self, url):
+        return self.url_index.get(url)
+
+    def add(self, url, body, content_type):
+        """Store body under its hash (once) and remember which URL it came from"""
+        digest = hashlib.sha256(body).hexdigest()
+        ext = CONTENT_TYPE_EXTENSIONS.get(content_type) or os.path.splitext(urlsplit(url).path)[1].lower() or '.img'
+        path = self.original_path(digest, ext)
+
+        # Identical bytes always land on the same path, so two threads racing here is harmless
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        entry = {'sha256': digest, 'ext': ext}
+        with self._lock:
+            self.url_index[url] = entry
+        return entry
+
+    def save(self):
+        # Downloads may still be adding entries, so write a consistent copy
+        with self._lock:
+            url_index = dict(self.url_index)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(url_index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+
+def download_images(urls, store, workers=DEFAULT_WORKERS, timeout=30):
+    """Fetch every URL the store doesn't know yet, keeping at most 2 * workers requests queued"""
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    pending_urls = [url for url in dict.fromkeys(urls) if store.lookup(url) is None]
+    logger.info(f"{len(pending_urls)} new image URLs to download ({len(store.url_index)} already stored)")
+
+    client = PooledHttpClient(timeout=timeout)
+    downloaded = failed = 0
+    next_report = SAVE_EVERY
+
+    def fetch(url):
+        body, content_type = client.get(url)
+        return store.add(url, body, content_type)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = {}
+            url_iter = iter(pending_urls)
+            while True:
+                while len(in_flight) < workers * 2:
+                    url = next(url_iter, None)
+                    if url is None:
+                        break
+                    in_flight[executor.submit(fetch, url)] = url
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        future.result()
+                        downloaded += 1
+                    except Exception as e:
+                        failed += 1
+                        logger.debug(f"Failed to download {url}: {e}")
+
+                # Checkpoint the index so an interrupted run doesn't lose track of files already on disk
+                if downloaded + failed >= next_report:
+                    next_report += SAVE_EVERY
+                    store.save()
+                    logger.info(f"Images: {downloaded} downloaded, {failed} failed of {len(pending_urls)}")
+    finally:
+        store.save()
+
+    logger.info(f"Downloaded {downloaded} images, {failed} failed")
+    return downloaded, failed
+
+
+def make_thumbnail(source_path, thumbnail_path, size):
+    """Resize one image to fit within size x size (runs in a worker process)"""
+    from PIL import Image
+
+    os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+    tmp_path = f"{thumbnail_path}.{os.getpid()}.tmp"
+    with Image.open(source_path) as image:
+        image.thumbnail((size, size))
+        image.convert('RGB').save(tmp_path, 'JPEG', quality=82, optimize=True)
+    os.replace(tmp_path, thumbnail_path)
+    return thumbnail_path
+
+
+def generate_thumbnails(store, size=DEFAULT_THUMBNAIL_SIZE, processes=None):
+    """Thumbnail every stored image that doesn't have one yet"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("Pillow is not installed - skipping thumbnails (pip install Pillow)")
+        return 0
+
+    jobs = {}
+    for entry in store.url_index.values():
+        digest = entry['sha256']
+        if digest not in jobs and not os.path.exists(store.thumbnail_path(digest)):
+            jobs[digest] = (store.original_path(digest, entry['ext']), store.thumbnail_path(digest))
+
+    made = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(make_thumbnail, source, target, size): digest
+                   for digest, (source, target) in jobs.items()}
+        for future, digest in futures.items():
+            try:
+                future.result()
+                made += 1
+            except Exception as e:
+                logger.debug(f"Could not thumbnail {digest}: {e}")
+
+    logger.info(f"Generated {made} thumbnails ({len(jobs) - made} failed)")
+    return made
+
+
+def venue_image_urls(store, image_urls, public_base_url=None):
+    """URLs to publish for a venue: hosted thumbnails when a base URL is given, else the source URLs.
+    Images that failed to download are left out and the same photo under two URLs appears once."""
+    published = {}
+    for url in image_urls:
+        entry = store.lookup(url)
+        if entry is None or entry['sha256'] in published:
+            continue
+        if not public_base_url:
+            published[entry['sha256']] = url
+        elif os.path.exists(store.thumbnail_path(entry['sha256'])):
+            published[entry['sha256']] = f"{public_base_url.rstrip('/')}/{store.relative_thumbnail_path(entry['sha256'])}"
+    return list(published.values())
+
+
+def fill_post_images(input_csv, output_csv, venue_images, store, public_base_url=None):
+    """Rewrite post_images for every row whose official_review_url has collected images.
+    A venue none of whose images could be downloaded gets an empty post_images rather than dead links."""
+    filled = 0
+    with open(input_csv, 'r', newline='', encoding='utf-8') as f_in, \
+            open(output_csv, 'w', newline='', encoding='utf-8') as f_out:
+        reader = csv.DictReader(f_in)
+        writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        for row in reader:
+            image_urls = venue_images.get(row.get('official_review_url', ''))
+            if image_urls:
+                published = venue_image_urls(store, image_urls, public_base_url)
+                row['post_images'] = format_post_images(published)
+                if published:
+                    filled += 1
+            writer.writerow(row)
+    return filled
+
+
+def load_venue_images(venues_json):
+    """Map venue URL -> image URLs from a scraped venues JSON file"""
+    with open(venues_json, 'r', encoding='utf-8') as f:
+        venues = json.load(f)
+    return {venue['url']: venue.get('images', []) for venue in venues if venue.get('url')}
+
+
+def main():
+    """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Download venue images, build thumbnails and fill post_images')
+    parser.add_argument('venues_json', help='Scraped venues JSON (progress file) with an images list per venue')
+    parser.add_argument('--store', default='venue_images', help='Local image store directory')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Concurrent downloads')
+    parser.add_argument('--processes', type=int, help='Thumbnail worker processes (default: CPU count)')
+    parser.add_argument('--size', type=int, default=DEFAULT_THUMBNAIL_SIZE, help='Thumbnail bounding box in pixels')
+    parser.add_argument('--csv', help='GeoDirectory CSV whose post_images should be filled')
+    parser.add_argument('--output', help='Where to write the updated CSV (required with --csv)')
+    parser.add_argument('--public-base-url', help='URL the store is served from; publishes thumbnails instead of source URLs')
+    args = parser.parse_args()
+
+    if args.csv and not args.output:
+        parser.error('--output is required with --csv')
+
+    venue_images = load_venue_images(args.venues_json)
+    store = ImageStore(args.store)
+    download_images([url for urls in venue_images.values() for url in urls], store, args.workers)
+    generate_thumbnails(store, args.size, args.processes)
+
+    if args.csv:
+        filled = fill_post_images(args.csv, args.output, venue_images, store, args.public_base_url)
+        logger.info(f"🖼️  Filled post_images for {filled} venues -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
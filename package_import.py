@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Split a GeoDirectory CSV into import-sized chunks
+The WordPress importer times out on multi-thousand-row files, so each chunk stays under a row and byte budget
+"""
+
+import argparse
+import csv
+import io
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Comfortably inside what the GeoDirectory importer handles per request
+DEFAULT_ROWS_PER_CHUNK = 500
+DEFAULT_MAX_CHUNK_BYTES = 2 * 1024 * 1024
+
+
+def _encode_row(fieldnames, row):
+    """Render a single CSV row so its size is known before it's written"""
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore').writerow(row)
+    return buffer.getvalue().encode('utf-8')
+
+
+def package_csv(input_csv, output_dir, rows_per_chunk=DEFAULT_ROWS_PER_CHUNK,
+                max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES, prefix=None):
+    """Stream input_csv into numbered chunk files, each with its own header row"""
+    if rows_per_chunk < 1:
+        raise ValueError("rows_per_chunk must be at least 1")
+
+    prefix = prefix or os.path.splitext(os.path.basename(input_csv))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    chunk_paths = []
+    chunk_file = None
+    chunk_rows = 0
+    chunk_bytes = 0
+
+    with open(input_csv, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        header = _encode_row(fieldnames, dict(zip(fieldnames, fieldnames)))
+
+        try:
+            for row in reader:
+                encoded = _encode_row(fieldnames, row)
+
+                # A single oversized row still gets its own chunk rather than being dropped
+                full = chunk_rows >= rows_per_chunk or (
+                    chunk_rows and chunk_bytes + len(encoded) > max_chunk_bytes
+                )
+                if chunk_file is None or full:
+                    if chunk_file is not None:
+                        chunk_file.close()
+                    chunk_path = os.path.join(output_dir, f"{prefix}_part{len(chunk_paths) + 1:03d}.csv")
+                    chunk_file = open(chunk_path, 'wb')
+                    chunk_file.write(header)
+                    chunk_paths.append(chunk_path)
+                    chunk_rows = 0
+                    chunk_bytes = len(header)
+
+                chunk_file.write(encoded)
+                chunk_rows += 1
+                chunk_bytes += len(encoded)
+        finally:
+            if chunk_file is not None:
+                chunk_file.close()
+
+    logger.info(f"Packaged {input_csv} into {len(chunk_paths)} chunk(s) in {output_dir}")
+    return chunk_paths
+
+
+def main():
+    """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Split a GeoDirectory CSV into import-sized chunks')
+    parser.add_argument('input_csv', help='GeoDirectory CSV to split')
+    parser.add_argument('-o', '--output-dir', default='import_chunks', help='Where to write the chunk files')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS_PER_CHUNK, help='Maximum rows per chunk')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_CHUNK_BYTES, help='Maximum bytes per chunk')
+    parser.add_argument('--prefix', help='Chunk filename prefix (defaults to the input filename)')
+    args = parser.parse_args()
+
+    try:
+        chunk_paths = package_csv(args.input_csv, args.output_dir, args.rows, args.max_bytes, args.prefix)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Could not package {args.input_csv}: {e}")
+        return 1
+
+    for chunk_path in chunk_paths:
+        logger.info(f"📦 {chunk_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
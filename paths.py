@@ -0,0 +1,27 @@
+"""
+Where the scraper and its offline tools read and write files
+Everything lives under one data directory: --data-dir, else $DOG_FRIENDLY_DATA_DIR, else the current directory
+"""
+
+import os
+
+DATA_DIR_ENV = 'DOG_FRIENDLY_DATA_DIR'
+
+# Original GeoDirectory export whose columns (and IDs) every generated CSV must match
+EXISTING_CSV_NAME = 'gd_place_2508250852_561054b5 - gd_place_2508250852_561054b5.csv.csv'
+ID_MAP_NAME = 'bringfido_id_map.json'
+
+# Hand-entered venues ship with the code rather than the data directory
+MANUAL_VENUES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manual_venues.jsonl')
+
+
+def default_data_dir():
+    return os.environ.get(DATA_DIR_ENV) or os.getcwd()
+
+
+def existing_csv_path(data_dir=None):
+    return os.path.join(data_dir or default_data_dir(), EXISTING_CSV_NAME)
+
+
+def id_map_path(data_dir=None):
+    return os.path.join(data_dir or default_data_dir(), ID_MAP_NAME)
@@ -10,19 +10,28 @@ import json
 import re
 import logging
 from datetime import datetime
-from playwright.sync_api import sync_playwright
+from contextlib import nullcontext
 import random
 import os
 
+from amenity_tagger import AmenityTagger
+from id_allocator import IdAllocator, combine_with_export
+from paths import default_data_dir, existing_csv_path, id_map_path
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class BringFidoProductionScraper:
-    def __init__(self):
+    def __init__(self, output_dir=None, existing_csv=None, id_map=None, profiler=None):
         self.base_url = "https://www.bringfido.ca"
+        self.output_dir = output_dir or default_data_dir()
+        self.existing_csv = existing_csv or existing_csv_path(self.output_dir)
+        self.id_map_path = id_map or id_map_path(self.output_dir)
+        self.profiler = profiler  # optional VenueProfiler for --profile runs
         self.all_venues = []
         self.failed_urls = []
+        self.amenity_tagger = AmenityTagger()
         
         # Category mappings - updated based on test results
         self.categories = {
@@ -150,7 +159,8 @@ class BringFidoProductionScraper:
                         latitude: '',
                         longitude: '',
                         rating: '',
-                        review_count: ''
+                        review_count: '',
+                        images: []
                     };
                     
                     // Get name from h1
@@ -240,6 +250,24 @@ class BringFidoProductionScraper:
                         }
                     }
                     
+                    // Collect venue photos (skip logos, icons and inline images)
+                    const seenImages = new Set();
+                    const ogImage = document.querySelector('meta[property="og:image"]');
+                    const imageSources = ogImage ? [ogImage.content] : [];
+                    for (let img of document.querySelectorAll('img')) {
+                        imageSources.push(img.currentSrc || img.src || img.getAttribute('data-src') || '');
+                    }
+                    for (let src of imageSources) {
+                        if (!src || !src.startsWith('http')) continue;
+                        const lower = src.toLowerCase();
+                        if (lower.endsWith('.svg') || lower.includes('logo') || lower.includes('icon') ||
+                            lower.includes('sprite') || lower.includes('avatar')) continue;
+                        if (!seenImages.has(src)) {
+                            seenImages.add(src);
+                            data.images.push(src);
+                        }
+                    }
+                    
                     return data;
                 }
             """)
@@ -263,11 +291,14 @@ class BringFidoProductionScraper:
             self.failed_urls.append(venue_url)
             return None
 
-    def format_for_csv(self, venues_data):
+    def format_for_csv(self, venues_data, id_allocator=None):
         """Format scraped data to match existing CSV structure"""
         formatted_data = []
         
         for i, venue in enumerate(venues_data, start=8000):  # Start from 8000 to avoid conflicts
+            # Stable per-URL ID when an allocator is available
+            if id_allocator is not None:
+                i = id_allocator.allocate(venue.get('url', ''))
             
             # Parse address components
             address = venue.get('address', '')
@@ -346,13 +377,79 @@ class BringFidoProductionScraper:
                 'to_verify_your_ownership_please_upload_any_of_the_': '',
                 'would_you_like_to_display_services__products': 0,
                 'would_you_like_to_add_cah': 0,
+                # Filled by image_pipeline once the collected photos are downloaded and checked
                 'post_images': ''
             }
             
+            # Fill post_tags and the amenities column from the description
+            self.amenity_tagger.tag_row(formatted_venue)
+            
             formatted_data.append(formatted_venue)
         
         return formatted_data
 
+    def save_dataset(self, all_venues, combined=True):
+        """Format venues and write the production CSV (plus the mega combined file)"""
+        logger.info(f"\\n🔄 Formatting {len(all_venues)} venues for final CSV...")
+        
+        # Existing export: source of the column order and of IDs we must never reuse
+        existing_csv = self.existing_csv
+        
+        # Same venue URL keeps the same ID across runs, never clashing with the existing export
+        id_allocator = IdAllocator(self.id_map_path)
+        id_allocator.reserve_from_csv(existing_csv)
+        formatted_data = self.format_for_csv(all_venues, id_allocator)
+        id_allocator.save()
+        
+        # Save the complete production dataset
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = os.path.join(self.output_dir, f"bringfido_PRODUCTION_COMPLETE_{timestamp}.csv")
+        
+        try:
+            with open(existing_csv, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                fieldnames = reader.fieldnames
+        except:
+            fieldnames = list(formatted_data[0].keys()) if formatted_data else []
+        
+        # Write complete production dataset
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(formatted_data)
+        
+        logger.info(f"🎉 PRODUCTION dataset saved: {output_file}")
+        logger.info(f"📊 Total venues scraped: {len(formatted_data)}")
+        
+        # Create mega combined file with existing data
+        if not combined:
+            return output_file
+        
+        try:
+            combined_file = os.path.join(self.output_dir, f"MEGA_COMBINED_DATASET_{timestamp}.csv")
+        
+            existing_data = []
+            with open(existing_csv, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                existing_data = list(reader)
+        
+            mega_data = combine_with_export(existing_data, formatted_data)
+        
+            with open(combined_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(mega_data)
+        
+            logger.info(f"🚀 MEGA combined dataset created: {combined_file}")
+            logger.info(f"📈 Total entries in mega dataset: {len(mega_data)}")
+            logger.info(f"🎯 Original entries: {len(existing_data)}")
+            logger.info(f"🆕 New BringFido entries: {len(formatted_data)}")
+        
+        except Exception as e:
+            logger.error(f"Could not create combined file: {e}")
+        
+        return output_file
+
     def scrape_category(self, page, category_name, category_info):
         """Scrape all venues from a specific category"""
         logger.info(f"Starting {category_name} scraping...")
@@ -379,7 +476,12 @@ class BringFidoProductionScraper:
             for i, venue_link in enumerate(venue_links, 1):
                 logger.info(f"Processing {category_name} {i}/{total_venues}: {venue_link['title']}")
                 
-                venue_data = self.extract_venue_details(page, venue_link['url'], category_name)
+                # Timed (and traced) per venue when profiling, otherwise a no-op
+                timing = self.profiler.venue(venue_link['url']) if self.profiler else nullcontext({})
+                with timing as venue_timing:
+                    venue_data = self.extract_venue_details(page, venue_link['url'], category_name)
+                    if venue_data is None:
+                        venue_timing['failed'] = True
                 if venue_data:
                     # Add title from listing if name wasn't found on detail page
                     if not venue_data.get('name'):
@@ -407,7 +509,7 @@ class BringFidoProductionScraper:
             return
             
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"/Users/shahed.miah/Projects/Dog Friendly Research/bringfido_progress_{filename_suffix}_{timestamp}.json"
+        filename = os.path.join(self.output_dir, f"bringfido_progress_{filename_suffix}_{timestamp}.json")
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
@@ -420,6 +522,9 @@ class BringFidoProductionScraper:
         """Run the complete production scraping process for all categories"""
         logger.info("🚀 Starting PRODUCTION BringFido scrape for all 800+ venues...")
         
+        # Imported here so offline formatting and merging never pay for the browser stack
+        from playwright.sync_api import sync_playwright
+        
         with sync_playwright() as p:
             browser = p.chromium.launch(
                 headless=True,  # Run headless for production efficiency
@@ -430,6 +535,10 @@ class BringFidoProductionScraper:
             # Set longer timeouts for production
             page.set_default_timeout(45000)
             
+            if self.profiler:
+                self.profiler.start()
+                self.profiler.attach(page)
+            
             try:
                 all_venues = []
                 
@@ -460,55 +569,7 @@ class BringFidoProductionScraper:
                 
                 # Format and save final complete dataset
                 if all_venues:
-                    logger.info(f"\\n🔄 Formatting {len(all_venues)} venues for final CSV...")
-                    formatted_data = self.format_for_csv(all_venues)
-                    
-                    # Save the complete production dataset
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    output_file = f"/Users/shahed.miah/Projects/Dog Friendly Research/bringfido_PRODUCTION_COMPLETE_{timestamp}.csv"
-                    
-                    # Get fieldnames from existing CSV
-                    existing_csv = '/Users/shahed.miah/Projects/Dog Friendly Research/gd_place_2508250852_561054b5 - gd_place_2508250852_561054b5.csv.csv'
-                    
-                    try:
-                        with open(existing_csv, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            fieldnames = reader.fieldnames
-                    except:
-                        fieldnames = list(formatted_data[0].keys()) if formatted_data else []
-                    
-                    # Write complete production dataset
-                    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.DictWriter(f, fieldnames=fieldnames)
-                        writer.writeheader()
-                        writer.writerows(formatted_data)
-                    
-                    logger.info(f"🎉 PRODUCTION dataset saved: {output_file}")
-                    logger.info(f"📊 Total venues scraped: {len(formatted_data)}")
-                    
-                    # Create mega combined file with existing data
-                    try:
-                        combined_file = f"/Users/shahed.miah/Projects/Dog Friendly Research/MEGA_COMBINED_DATASET_{timestamp}.csv"
-                        
-                        existing_data = []
-                        with open(existing_csv, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            existing_data = list(reader)
-                        
-                        mega_data = existing_data + formatted_data
-                        
-                        with open(combined_file, 'w', newline='', encoding='utf-8') as f:
-                            writer = csv.DictWriter(f, fieldnames=fieldnames)
-                            writer.writeheader()
-                            writer.writerows(mega_data)
-                        
-                        logger.info(f"🚀 MEGA combined dataset created: {combined_file}")
-                        logger.info(f"📈 Total entries in mega dataset: {len(mega_data)}")
-                        logger.info(f"🎯 Original entries: {len(existing_data)}")
-                        logger.info(f"🆕 New BringFido entries: {len(formatted_data)}")
-                        
-                    except Exception as e:
-                        logger.error(f"Could not create combined file: {e}")
+                    self.save_dataset(all_venues)
                 
                 else:
                     logger.warning("❌ No venues were scraped!")
@@ -546,6 +607,8 @@ class BringFidoProductionScraper:
                     self.save_progress(self.all_venues, "emergency_backup")
             
             finally:
+                if self.profiler:
+                    self.profiler.finish()
                 browser.close()
 
 def main():
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Full-text search over venue descriptions
+Builds a BM25 inverted index from a GeoDirectory CSV into a compact file that is memory-mapped at query time
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# File layout (all little-endian):
+#   header   | magic, doc count, term count, average doc length, section offsets
+#   terms    | fixed-size entries sorted by term: term offset, term length, doc freq, postings offset
+#   strings  | UTF-8 term bytes referenced by the term table
+#   postings | per term, doc freq doc numbers (u32) followed by the same number of BM25 impacts (f32)
+#              Filter terms ('cat:139', 'pc:NW3', 'pc:NW31AB') share the table with zero impacts;
+#              the tokenizer never emits ':' so they can't collide with words.
+#   docs     | offset table (u64 * (doc count + 1)) followed by one JSON record per doc
+#
+# The corpus never changes after a build, so each posting stores its finished BM25 score and a
+# query is just a sum of impacts per document.
+MAGIC = b'LDFIDX01'
+HEADER = struct.Struct('<8sIIdQQQQ')
+TERM_ENTRY = struct.Struct('<IHIQ')
+DOC_OFFSET = struct.Struct('<Q')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Columns whose text is searchable
+INDEXED_FIELDS = ('post_title', 'post_content', 'service_1_description', 'street', 'neighbourhood', 'zip')
+
+# Columns kept with each hit so results can be shown without the CSV
+STORED_FIELDS = ('ID', 'post_title', 'post_category', 'zip', 'official_review_url', 'service_1_description')
+
+# Same category IDs the scraper writes to post_category
+CATEGORY_IDS = {
+    'restaurants': '139',
+    'hotels': '193',
+    'attractions': '229',
+    'services': '77',
+}
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its near of on or our the their this to '
+    'we with you your'.split()
+)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords dropped and simple plurals folded"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall((text or '').lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def normalize_postcode(postcode):
+    return re.sub(r'\s+', '', postcode or '').upper()
+
+
+def filter_terms(row):
+    """Category and postcode terms for a row; a postcode is findable by its full form or outward code"""
+    terms = {f"cat:{category_id}" for category_id in (row.get('post_category') or '').split(',') if category_id}
+    postcode = normalize_postcode(row.get('zip'))
+    if postcode:
+        terms.add(f"pc:{postcode}")
+        if len(postcode) >= 5:
+            terms.add(f"pc:{postcode[:-3]}")
+    return terms
+
+
+def build_index(input_csv, index_path):
+    """Tokenise every row of input_csv and write the on-disk index"""
+    postings = {}
+    doc_lengths = []
+    doc_records = []
+
+    with open(input_csv, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            doc_number = len(doc_records)
+            tokens = tokenize(' '.join(row.get(field) or '' for field in INDEXED_FIELDS))
+            for term, freq in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_number, freq))
+            for term in filter_terms(row):
+                postings.setdefault(term, []).append((doc_number, 0))
+            doc_lengths.append(len(tokens))
+            record = {field: row.get(field) or '' for field in STORED_FIELDS}
+            doc_records.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    terms = sorted(postings)
+    doc_count = len(doc_records)
+    average_length = (sum(doc_lengths) / doc_count) if doc_count else 0.0
+
+    # Lay the sections out back to back after the header
+    terms_offset = HEADER.size
+    strings_offset = terms_offset + TERM_ENTRY.size * len(terms)
+    encoded_terms = [term.encode('utf-8') for term in terms]
+    postings_offset = strings_offset + sum(len(term) for term in encoded_terms)
+    docs_offset = postings_offset + 8 * sum(len(postings[term]) for term in terms)
+
+    with open(index_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, doc_count, len(terms), average_length,
+                            terms_offset, strings_offset, postings_offset, docs_offset))
+
+        string_position = strings_offset
+        posting_position = postings_offset
+        for term, encoded in zip(terms, encoded_terms):
+            f.write(TERM_ENTRY.pack(string_position, len(encoded), len(postings[term]), posting_position))
+            string_position += len(encoded)
+            posting_position += 8 * len(postings[term])
+
+        for encoded in encoded_terms:
+            f.write(encoded)
+
+        for term in terms:
+            doc_freq = len(postings[term])
+            idf = math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            doc_numbers = array('I')
+            impacts = array('f')
+            for doc_number, freq in postings[term]:
+                length_norm = 1 - BM25_B + BM25_B * doc_lengths[doc_number] / (average_length or 1)
+                doc_numbers.append(doc_number)
+                impacts.append(idf * freq * (BM25_K1 + 1) / (freq + BM25_K1 * length_norm))
+            if sys.byteorder != 'little':
+                doc_numbers.byteswap()
+                impacts.byteswap()
+            f.write(doc_numbers.tobytes())
+            f.write(impacts.tobytes())
+
+        record_position = docs_offset + DOC_OFFSET.size * (doc_count + 1)
+        for record in doc_records:
+            f.write(DOC_OFFSET.pack(record_position))
+            record_position += len(record)
+        f.write(DOC_OFFSET.pack(record_position))
+        for record in doc_records:
+            f.write(record)
+
+    logger.info(f"Indexed {doc_count} venues ({len(terms)} terms) -> {index_path}")
+    return doc_count
+
+
+class SearchIndex:
+    def __init__(self, index_path):
+        """Map the index file; only the header is read up front"""
+        self.index_path = index_path
+        self._file = open(index_path, 'rb')
+        self._map = None
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            self.close()
+            raise ValueError(f"{index_path} is not a venue search index")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self.doc_count, self.term_count, self.average_length, self._terms_offset,
+         self._strings_offset, self._postings_offset, self._docs_offset) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{index_path} is not a venue search index")
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _find_term(self, term):
+        """Binary search the sorted term table, returning (doc freq, postings offset)"""
+        encoded = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            string_offset, length, doc_freq, postings_offset = TERM_ENTRY.unpack_from(
+                self._map, self._terms_offset + middle * TERM_ENTRY.size)
+            candidate = self._map[string_offset:string_offset + length]
+            if candidate == encoded:
+                return doc_freq, postings_offset
+            if candidate < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _postings(self, doc_freq, postings_offset):
+        """Copy one term's doc numbers and impacts out of the map as typed arrays"""
+        impacts_offset = postings_offset + 4 * doc_freq
+        doc_numbers = array('I', self._map[postings_offset:impacts_offset])
+        impacts = array('f', self._map[impacts_offset:impacts_offset + 4 * doc_freq])
+        if sys.byteorder != 'little':
+            doc_numbers.byteswap()
+            impacts.byteswap()
+        return doc_numbers, impacts
+
+    def document(self, doc_number):
+        """Decode the stored fields of one document"""
+        start, end = struct.unpack_from('<QQ', self._map, self._docs_offset + doc_number * DOC_OFFSET.size)
+        return json.loads(self._map[start:end].decode('utf-8'))
+
+    def _filter_docs(self, category, postcode):
+        """Doc numbers allowed by the filters, or None when there are no filters"""
+        allowed = None
+        wanted_terms = []
+        if category:
+            wanted_terms.append(f"cat:{CATEGORY_IDS.get(category.lower(), category)}")
+        if postcode:
+            wanted_terms.append(f"pc:{normalize_postcode(postcode)}")
+
+        for term in wanted_terms:
+            found = self._find_term(term)
+            doc_numbers = set(self._postings(*found)[0]) if found else set()
+            allowed = doc_numbers if allowed is None else allowed & doc_numbers
+        return allowed
+
+    def search(self, query, limit=10, category=None, postcode=None):
+        """Return up to limit (score, stored fields) pairs ranked by BM25"""
+        scores = {}
+        for term in set(tokenize(query)):
+            found = self._find_term(term)
+            if found is None:
+                continue
+            doc_numbers, impacts = self._postings(*found)
+            if not scores:
+                scores = dict(zip(doc_numbers, impacts))
+                continue
+            get = scores.get
+            for doc_number, impact in zip(doc_numbers, impacts):
+                scores[doc_number] = get(doc_number, 0.0) + impact
+
+        allowed = self._filter_docs(category, postcode)
+        if allowed is not None:
+            scores = {doc_number: score for doc_number, score in scores.items() if doc_number in allowed}
+
+        # Stored fields are only decoded for the hits actually returned
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, self.document(doc_number)) for doc_number, score in ranked]
+
+
+def main():
+    """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Build or query the venue full-text search index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Index a GeoDirectory CSV')
+    build_parser.add_argument('input_csv', help='GeoDirectory CSV to index')
+    build_parser.add_argument('index_path', help='Where to write the index file')
+
+    query_parser = subparsers.add_parser('query', help='Search an index')
+    query_parser.add_argument('index_path', help='Index file written by build')
+    query_parser.add_argument('query', help='Search text, e.g. "beer garden near Hampstead"')
+    query_parser.add_argument('-n', '--limit', type=int, default=10, help='Maximum number of results')
+    query_parser.add_argument('--category', help='Category name (restaurants, hotels, ...) or post_category ID')
+    query_parser.add_argument('--postcode', help='Full postcode or outward code, e.g. NW3')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_index(args.input_csv, args.index_path)
+        return 0
+
+    with SearchIndex(args.index_path) as index:
+        start = time.perf_counter()
+        results = index.search(args.query, args.limit, args.category, args.postcode)
+        elapsed = (time.perf_counter() - start) * 1000
+
+    for score, doc in results:
+        print(f"{score:6.2f}  [{doc['ID']}] {doc['post_title']} ({doc['zip'] or 'no postcode'})  {doc['official_review_url']}")
+    logger.info(f"{len(results)} result(s) in {elapsed:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+from amenity_tagger import AmenityTagger
+
+
+def test_place_names_are_not_amenities():
+    tagger = AmenityTagger()
+
+    assert tagger.tag("A cosy wine bar in the heart of Covent Garden, two minutes from the market") == []
+    assert tagger.tag("Boutique hotel on Bayswater Terrace, a short walk from Hyde Park") == []
+    assert tagger.tag("Courtyard by Marriott London City Airport welcomes dogs under 20kg") == []
+
+
+def test_garden_phrases_still_tag():
+    tagger = AmenityTagger()
+
+    assert tagger.tag("Covent Garden pub with a big beer garden and water bowls by the bar") == ['Water Bowls', 'Garden']
+    assert tagger.tag("Dogs can join you on the roof terrace") == ['Garden']
+    assert tagger.tag("Plenty of outdoor seating") == ['Garden']
+
+
+def test_tag_row_falls_back_to_excerpt_only_without_content():
+    tagger = AmenityTagger()
+
+    row = tagger.tag_row({'post_content': 'Water bowls at the door', 'service_1_description': 'Dog menu...'})
+    assert row['post_tags'] == row['does_your_business_have_any_of_the_following'] == 'Water Bowls'
+
+    row = tagger.tag_row({'post_content': '', 'service_1_description': 'Dog menu and a beer garden...'})
+    assert row['post_tags'] == 'Dog Menu,Garden'
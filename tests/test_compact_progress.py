@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+from compact_progress import compact, iter_json_array
+
+
+def test_malformed_record_stops_within_max_record_size(tmp_path):
+    records = [json.dumps({'url': f'u{i}', 'description': 'x' * 200}) for i in range(2000)]
+    records[3] = '{"url": "bad", "description": "unterminated}'
+    path = tmp_path / 'bringfido_progress_x_20250101_000000.json'
+    path.write_text('[\n' + ',\n'.join(records) + '\n]', encoding='utf-8')
+
+    parsed = []
+    with pytest.raises(ValueError, match='no valid record within'):
+        for record in iter_json_array(str(path), chunk_size=1024, max_record_size=8 * 1024):
+            parsed.append(record['url'])
+    assert parsed == ['u0', 'u1', 'u2']
+
+
+@pytest.mark.parametrize('manual_mtime', [0, 4_000_000_000])
+def test_manual_entries_always_beat_snapshots(tmp_path, manual_mtime):
+    snapshot = tmp_path / 'bringfido_progress_after_restaurants_20250801_120000.json'
+    snapshot.write_text(json.dumps([
+        {'url': 'https://www.bringfido.ca/restaurant/1', 'name': 'Scraped'},
+        {'url': 'https://www.bringfido.ca/restaurant/2', 'name': 'Only scraped'},
+    ]))
+    manual = tmp_path / 'manual_venues.jsonl'
+    manual.write_text(json.dumps({'url': 'https://www.bringfido.ca/restaurant/1', 'name': 'Hand-entered'}) + '\n')
+    os.utime(manual, (manual_mtime, manual_mtime))
+    later_manual = tmp_path / 'corrections.jsonl'
+    later_manual.write_text(json.dumps({'url': 'https://www.bringfido.ca/restaurant/3', 'name': 'Old fix'}) + '\n'
+                            + json.dumps({'url': 'https://www.bringfido.ca/restaurant/3', 'name': 'New fix'}) + '\n')
+
+    output = tmp_path / 'compacted.json'
+    assert compact([str(snapshot)], str(output), [str(manual), str(later_manual)]) == 3
+
+    names = {record['url'][-1]: record['name'] for record in json.loads(output.read_text())}
+    assert names == {'1': 'Hand-entered', '2': 'Only scraped', '3': 'New fix'}
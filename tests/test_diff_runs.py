@@ -0,0 +1,68 @@
+import csv
+
+from diff_runs import diff_runs
+
+
+def write_csv(path, fieldnames, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_keys(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['official_review_url'] for row in csv.DictReader(f)]
+
+
+def test_reordered_columns_are_unchanged(tmp_path):
+    rows = [
+        {'ID': '1', 'post_title': 'The Spaniards Inn', 'official_review_url': 'https://x/a', 'post_modified': '2025-01-01'},
+        {'ID': '2', 'post_title': 'The Holly Bush', 'official_review_url': 'https://x/b', 'post_modified': '2025-01-01'},
+    ]
+    write_csv(tmp_path / 'old.csv', ['ID', 'post_title', 'official_review_url', 'post_modified'], rows)
+    for row in rows:
+        row['ID'] = str(int(row['ID']) + 100)
+        row['post_modified'] = '2025-02-01'
+    write_csv(tmp_path / 'new.csv', ['official_review_url', 'post_modified', 'post_title', 'ID'], rows)
+
+    counts, _ = diff_runs(tmp_path / 'old.csv', tmp_path / 'new.csv', tmp_path / 'delta')
+
+    assert counts['unchanged'] == 2
+    assert counts['added'] == counts['changed'] == counts['removed'] == 0
+
+
+def test_duplicate_new_key_is_skipped(tmp_path):
+    fieldnames = ['ID', 'post_title', 'official_review_url']
+    write_csv(tmp_path / 'old.csv', fieldnames, [
+        {'ID': '1', 'post_title': 'The Spaniards Inn', 'official_review_url': 'https://x/a'},
+    ])
+    write_csv(tmp_path / 'new.csv', fieldnames, [
+        {'ID': '1', 'post_title': 'The Spaniards Inn', 'official_review_url': 'https://x/a'},
+        {'ID': '2', 'post_title': 'The Spaniards Inn (copy)', 'official_review_url': 'https://x/a'},
+        {'ID': '3', 'post_title': 'The Holly Bush', 'official_review_url': 'https://x/b'},
+    ])
+
+    counts, paths = diff_runs(tmp_path / 'old.csv', tmp_path / 'new.csv', tmp_path / 'delta')
+
+    assert counts['duplicate'] == 1
+    assert counts['unchanged'] == 1
+    assert read_keys(paths['added']) == ['https://x/b']
+    assert read_keys(paths['changed']) == []
+
+
+def test_duplicate_old_key_keeps_first_row(tmp_path):
+    fieldnames = ['ID', 'post_title', 'official_review_url']
+    write_csv(tmp_path / 'old.csv', fieldnames, [
+        {'ID': '1', 'post_title': 'The Spaniards Inn', 'official_review_url': 'https://x/a'},
+        {'ID': '2', 'post_title': 'The Spaniards Inn (stale copy)', 'official_review_url': 'https://x/a'},
+    ])
+    write_csv(tmp_path / 'new.csv', fieldnames, [
+        {'ID': '1', 'post_title': 'The Spaniards Inn', 'official_review_url': 'https://x/a'},
+    ])
+
+    counts, paths = diff_runs(tmp_path / 'old.csv', tmp_path / 'new.csv', tmp_path / 'delta')
+
+    assert counts['unchanged'] == 1
+    assert counts['changed'] == counts['removed'] == 0
+    assert read_keys(paths['changed']) == read_keys(paths['removed']) == []
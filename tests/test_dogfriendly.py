@@ -0,0 +1,37 @@
+import csv
+import glob
+import json
+import os
+
+import package_import
+from dogfriendly import build_parser, main
+
+
+def test_format_keeps_newest_record_per_url(tmp_path):
+    older = tmp_path / 'bringfido_progress_restaurants_progress_25_20250801_100000.json'
+    newer = tmp_path / 'bringfido_progress_after_restaurants_20250801_120000.json'
+    older.write_text(json.dumps([
+        {'name': 'The Spaniards Inn', 'url': 'https://www.bringfido.ca/restaurant/1', 'category': 'restaurants'},
+        {'name': 'Holly Bush (old name)', 'url': 'https://www.bringfido.ca/restaurant/2', 'category': 'restaurants'},
+    ]))
+    newer.write_text(json.dumps([
+        {'name': 'The Spaniards Inn', 'url': 'https://www.bringfido.ca/restaurant/1', 'category': 'restaurants'},
+        {'name': 'The Holly Bush', 'url': 'https://www.bringfido.ca/restaurant/2', 'category': 'restaurants'},
+        {'name': 'The Flask', 'url': 'https://www.bringfido.ca/restaurant/3', 'category': 'restaurants'},
+    ]))
+
+    # Newest file listed first: precedence comes from the snapshot time, not argument order
+    assert main(['--data-dir', str(tmp_path), 'format', str(newer), str(older)]) == 0
+
+    [output] = glob.glob(os.path.join(tmp_path, 'bringfido_PRODUCTION_COMPLETE_*.csv'))
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['post_title'] for row in rows] == ['The Spaniards Inn', 'The Holly Bush', 'The Flask']
+    assert len({row['ID'] for row in rows}) == 3
+
+
+def test_export_defaults_come_from_package_import():
+    args = build_parser().parse_args(['export', 'big.csv'])
+
+    assert args.rows == package_import.DEFAULT_ROWS_PER_CHUNK
+    assert args.max_bytes == package_import.DEFAULT_MAX_CHUNK_BYTES
@@ -0,0 +1,52 @@
+import csv
+
+from id_allocator import IdAllocator
+
+
+def write_export(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['ID', 'post_title', 'official_review_url'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def saved_allocator(tmp_path):
+    """A map from an earlier run: u1..u4 -> 8000..8003"""
+    state_path = tmp_path / 'ids.json'
+    allocator = IdAllocator(str(state_path))
+    for n in range(1, 5):
+        allocator.allocate(f'u{n}')
+    allocator.save()
+    return str(state_path)
+
+
+def test_export_id_taken_by_other_row_moves_mapped_url(tmp_path):
+    state_path = saved_allocator(tmp_path)
+    export = tmp_path / 'export.csv'
+    write_export(export, [
+        {'ID': '8003', 'post_title': 'Native WordPress post', 'official_review_url': ''},
+        {'ID': '8002', 'post_title': 'Someone else', 'official_review_url': 'elsewhere'},
+    ])
+
+    allocator = IdAllocator(state_path)
+    allocator.reserve_from_csv(str(export))
+
+    u3, u2, other = allocator.allocate('u3'), allocator.allocate('u2'), allocator.allocate('other')
+    assert u3 not in (8002, 8003)
+    assert u2 not in (8002, 8003)
+    assert len({u3, u2, other, 8002, 8003}) == 5
+    assert allocator.allocate('elsewhere') == 8002
+    assert allocator.allocate('u1') == 8000
+
+
+def test_export_id_wins_for_already_mapped_url(tmp_path):
+    state_path = saved_allocator(tmp_path)
+    export = tmp_path / 'export.csv'
+    write_export(export, [{'ID': '2119', 'post_title': 'Imported earlier', 'official_review_url': 'u4'}])
+
+    allocator = IdAllocator(state_path)
+    allocator.reserve_from_csv(str(export))
+    allocator.save()
+
+    assert allocator.allocate('u4') == 2119
+    assert IdAllocator(state_path).allocate('u4') == 2119
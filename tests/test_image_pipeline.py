@@ -0,0 +1,100 @@
+import csv
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from image_pipeline import ImageStore, download_images, fill_post_images
+
+PHOTO = b'\xff\xd8\xff\xe0 pretend jpeg'
+OTHER_PHOTO = b'\x89PNG pretend png'
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    files = {
+        '/photo.jpg': (PHOTO, 'image/jpeg'),
+        '/same-photo.jpg': (PHOTO, 'image/jpeg'),
+        '/other.png': (OTHER_PHOTO, 'image/png'),
+    }
+    requests = Counter()
+
+    def do_GET(self):
+        self.requests[self.path] += 1
+        if self.path == '/moved.png':
+            self.send_response(302)
+            self.send_header('Location', '/other.png')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path not in self.files:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body, content_type = self.files[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    ImageHandler.requests.clear()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_dedupes_follows_redirects_and_skips_known_urls(tmp_path, image_server):
+    urls = [f"{image_server}{path}" for path in ('/photo.jpg', '/same-photo.jpg', '/other.png', '/moved.png', '/gone.jpg')]
+    store = ImageStore(str(tmp_path / 'store'))
+
+    assert download_images(urls, store, workers=2) == (4, 1)
+
+    photo, same_photo, other, moved = (store.lookup(url) for url in urls[:4])
+    assert photo == same_photo
+    assert moved == other
+    assert store.lookup(urls[4]) is None
+    assert len(list((tmp_path / 'store' / 'originals').rglob('*.*'))) == 2
+
+    # A rerun reloads the saved index and only retries the URL that failed
+    requests_before = Counter(ImageHandler.requests)
+    rerun_store = ImageStore(str(tmp_path / 'store'))
+    assert rerun_store.lookup(urls[0]) == photo
+    assert download_images(urls, rerun_store, workers=2) == (0, 1)
+    assert ImageHandler.requests - requests_before == Counter({'/gone.jpg': 1})
+
+
+def test_fill_post_images_drops_failed_and_duplicate_images(tmp_path, image_server):
+    venues = {
+        'https://www.bringfido.ca/restaurant/1': [f"{image_server}/photo.jpg", f"{image_server}/same-photo.jpg",
+                                                  f"{image_server}/gone.jpg"],
+        'https://www.bringfido.ca/restaurant/2': [f"{image_server}/gone.jpg"],
+    }
+    store = ImageStore(str(tmp_path / 'store'))
+    download_images([url for urls in venues.values() for url in urls], store, workers=2)
+
+    input_csv = tmp_path / 'in.csv'
+    with open(input_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['ID', 'official_review_url', 'post_images'])
+        writer.writeheader()
+        for venue_id, url in enumerate(venues, 1):
+            writer.writerow({'ID': venue_id, 'official_review_url': url, 'post_images': f"{image_server}/gone.jpg|||"})
+
+    output_csv = tmp_path / 'out.csv'
+    assert fill_post_images(str(input_csv), str(output_csv), venues, store) == 1
+
+    with open(output_csv, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]['post_images'] == f"{image_server}/photo.jpg|||"
+    assert rows[1]['post_images'] == ''
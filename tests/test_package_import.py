@@ -0,0 +1,76 @@
+import csv
+
+import pytest
+
+from package_import import package_csv
+
+FIELDNAMES = ['ID', 'post_title', 'post_content']
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_chunk(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def make_rows(count, content='x'):
+    return [{'ID': str(n), 'post_title': f'Venue {n}', 'post_content': content} for n in range(count)]
+
+
+def test_round_trip_respects_row_limit(tmp_path):
+    rows = make_rows(12)
+    write_csv(tmp_path / 'big.csv', rows)
+
+    chunks = package_csv(str(tmp_path / 'big.csv'), str(tmp_path / 'out'), rows_per_chunk=5)
+
+    assert [path.rsplit('_', 1)[1] for path in chunks] == ['part001.csv', 'part002.csv', 'part003.csv']
+    read_back = []
+    for path in chunks:
+        fieldnames, chunk_rows = read_chunk(path)
+        assert fieldnames == FIELDNAMES
+        assert len(chunk_rows) <= 5
+        read_back.extend(chunk_rows)
+    assert read_back == rows
+
+
+def test_round_trip_respects_byte_limit(tmp_path):
+    rows = make_rows(20, content='dog friendly, with "quotes"\nand newlines ' * 5)
+    write_csv(tmp_path / 'big.csv', rows)
+
+    chunks = package_csv(str(tmp_path / 'big.csv'), str(tmp_path / 'out'), rows_per_chunk=500,
+                         max_chunk_bytes=2000)
+
+    assert len(chunks) > 1
+    read_back = []
+    for path in chunks:
+        with open(path, 'rb') as f:
+            assert len(f.read()) <= 2000
+        fieldnames, chunk_rows = read_chunk(path)
+        assert fieldnames == FIELDNAMES
+        read_back.extend(chunk_rows)
+    assert read_back == rows
+
+
+def test_oversized_row_gets_its_own_chunk(tmp_path):
+    rows = make_rows(3)
+    rows[1]['post_content'] = 'y' * 5000
+    write_csv(tmp_path / 'big.csv', rows)
+
+    chunks = package_csv(str(tmp_path / 'big.csv'), str(tmp_path / 'out'), max_chunk_bytes=1000)
+
+    assert [read_chunk(path)[1] for path in chunks] == [[rows[0]], [rows[1]], [rows[2]]]
+    assert all(read_chunk(path)[0] == FIELDNAMES for path in chunks)
+
+
+def test_rejects_zero_rows_per_chunk(tmp_path):
+    write_csv(tmp_path / 'big.csv', make_rows(1))
+
+    with pytest.raises(ValueError):
+        package_csv(str(tmp_path / 'big.csv'), str(tmp_path / 'out'), rows_per_chunk=0)
@@ -0,0 +1,40 @@
+import csv
+import glob
+import os
+
+from scrape_bringfido_production import BringFidoProductionScraper
+
+
+def write_export(path, rows):
+    # Same columns as the real export, which are the ones format_for_csv produces
+    fieldnames = list(BringFidoProductionScraper(str(path.parent)).format_for_csv([{}])[0])
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_combined_file_replaces_venue_already_in_export(tmp_path):
+    export = tmp_path / 'export.csv'
+    write_export(export, [
+        {'ID': '3380', 'post_title': 'Native post', 'official_review_url': ''},
+        {'ID': '3381', 'post_title': 'Smith and Whistle (old)', 'official_review_url': 'https://www.bringfido.ca/restaurant/548'},
+    ])
+    scraper = BringFidoProductionScraper(str(tmp_path), str(export), str(tmp_path / 'ids.json'))
+
+    scraper.save_dataset([
+        {'name': 'Smith and Whistle', 'url': 'https://www.bringfido.ca/restaurant/548', 'category': 'restaurants'},
+        {'name': 'The Three Stags', 'url': 'https://www.bringfido.ca/restaurant/549', 'category': 'restaurants'},
+    ])
+
+    [combined] = glob.glob(os.path.join(tmp_path, 'MEGA_COMBINED_DATASET_*.csv'))
+    rows = read_rows(combined)
+    ids = [row['ID'] for row in rows]
+    assert len(ids) == len(set(ids)) == 3
+    assert [row['post_title'] for row in rows if row['ID'] == '3381'] == ['Smith and Whistle']
+    assert 'Native post' in [row['post_title'] for row in rows]
@@ -0,0 +1,113 @@
+import csv
+import math
+from collections import Counter
+
+import pytest
+
+from search_index import BM25_B, BM25_K1, SearchIndex, build_index, tokenize
+
+VENUES = [
+    {'ID': '1', 'post_title': 'The Garden Gate', 'post_content': 'Beer garden pub with a beer garden out back',
+     'post_category': '139', 'zip': 'NW3 1AB'},
+    {'ID': '2', 'post_title': 'The Flask', 'post_content': 'Cosy pub with a small beer garden and open fires',
+     'post_category': '139', 'zip': 'N6 6BU'},
+    {'ID': '3', 'post_title': 'Hampstead Lodge', 'post_content': 'Boutique hotel near the heath with a garden',
+     'post_category': '193', 'zip': 'NW3 2QG'},
+    {'ID': '4', 'post_title': 'Heath Walks', 'post_content': 'Guided dog walks across the heath',
+     'post_category': '229,139', 'zip': ''},
+]
+FIELDNAMES = ['ID', 'post_title', 'post_content', 'post_category', 'zip', 'official_review_url']
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    input_csv = tmp_path / 'venues.csv'
+    with open(input_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        for venue in VENUES:
+            writer.writerow({**venue, 'official_review_url': f"https://www.bringfido.ca/venue/{venue['ID']}"})
+    path = tmp_path / 'venues.idx'
+    assert build_index(str(input_csv), str(path)) == len(VENUES)
+    return str(path)
+
+
+def reference_bm25(query):
+    """Textbook BM25 over the indexed fields of VENUES"""
+    docs = [tokenize(' '.join([venue['post_title'], venue['post_content'], venue['zip']])) for venue in VENUES]
+    average_length = sum(map(len, docs)) / len(docs)
+    scores = {}
+    for venue, tokens in zip(VENUES, docs):
+        counts = Counter(tokens)
+        score = 0.0
+        for term in set(tokenize(query)):
+            doc_freq = sum(1 for other in docs if term in other)
+            if not counts[term]:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq + 0.5) / (doc_freq + 0.5))
+            length_norm = 1 - BM25_B + BM25_B * len(tokens) / average_length
+            score += idf * counts[term] * (BM25_K1 + 1) / (counts[term] + BM25_K1 * length_norm)
+        if score:
+            scores[venue['ID']] = score
+    return scores
+
+
+def ids(results):
+    return [doc['ID'] for _, doc in results]
+
+
+def test_round_trip_returns_stored_fields(index_path):
+    with SearchIndex(index_path) as index:
+        assert index.doc_count == len(VENUES)
+        [(score, doc)] = index.search('flask')
+
+    assert score > 0
+    assert doc == {'ID': '2', 'post_title': 'The Flask', 'post_category': '139', 'zip': 'N6 6BU',
+                   'official_review_url': 'https://www.bringfido.ca/venue/2', 'service_1_description': ''}
+
+
+def test_bm25_ranking_matches_reference(index_path):
+    expected = reference_bm25('beer gardens')
+
+    with SearchIndex(index_path) as index:
+        results = index.search('beer gardens')
+
+    assert ids(results) == sorted(expected, key=expected.get, reverse=True) == ['1', '2', '3']
+    for score, doc in results:
+        assert score == pytest.approx(expected[doc['ID']], rel=1e-5)
+
+
+def test_category_filter_by_name_or_id(index_path):
+    expected = reference_bm25('garden heath')
+    restaurants = sorted(('1', '2', '4'), key=expected.get, reverse=True)
+
+    with SearchIndex(index_path) as index:
+        assert ids(index.search('garden heath', category='restaurants')) == restaurants
+        assert ids(index.search('garden heath', category='Hotels')) == ['3']
+        assert ids(index.search('heath', category='229')) == ['4']
+        assert index.search('heath', category='77') == []
+
+
+def test_postcode_filter_by_full_or_outward_code(index_path):
+    with SearchIndex(index_path) as index:
+        assert sorted(ids(index.search('garden', postcode='NW3'))) == ['1', '3']
+        assert ids(index.search('garden', postcode='nw3 2qg')) == ['3']
+        assert ids(index.search('garden', category='restaurants', postcode='NW3')) == ['1']
+        assert index.search('garden', postcode='SW1') == []
+
+
+def test_query_with_no_known_terms(index_path):
+    with SearchIndex(index_path) as index:
+        assert index.search('zeppelin') == []
+        assert index.search('the and of') == []
+
+
+def test_rejects_files_that_are_not_indexes(tmp_path):
+    not_index = tmp_path / 'venues.csv'
+    not_index.write_text('ID,post_title\n' + ''.join(f'{n},Venue {n}\n' for n in range(20)))
+    empty = tmp_path / 'empty.idx'
+    empty.write_bytes(b'')
+
+    for path in (not_index, empty):
+        with pytest.raises(ValueError, match='not a venue search index'):
+            SearchIndex(str(path))
@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+
+import venue_profiler
+from venue_profiler import VenueProfiler
+
+
+class FakeTracing:
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.chunks = 0
+
+    def start(self, **kwargs):
+        if 'start' in self.fail_on:
+            raise RuntimeError('tracing unavailable')
+
+    def start_chunk(self, title=None):
+        if 'start_chunk' in self.fail_on:
+            raise RuntimeError('page crashed')
+        self.chunks += 1
+
+    def stop_chunk(self, path=None):
+        if 'stop_chunk' in self.fail_on:
+            raise RuntimeError('target closed')
+        if path:
+            with open(path, 'wb') as f:
+                f.write(b'trace')
+
+    def stop(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, tracing):
+        self.tracing = tracing
+
+
+class FakePage:
+    def __init__(self, tracing):
+        self.context = FakeContext(tracing)
+
+    def on(self, event, handler):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(venue_profiler.time, 'perf_counter', fake.perf_counter)
+    return fake
+
+
+def make_profiler(tmp_path, tracing, slow_threshold=10, keep_traces=2):
+    profiler = VenueProfiler(str(tmp_path / 'profile'), slow_threshold, keep_traces)
+    profiler.start()
+    profiler.attach(FakePage(tracing))
+    return profiler
+
+
+def time_venue(profiler, clock, url, seconds):
+    with profiler.venue(url):
+        clock.now += seconds
+
+
+def test_would_keep(tmp_path):
+    profiler = VenueProfiler(str(tmp_path), slow_threshold=10, keep_traces=2)
+
+    assert not profiler._would_keep(5)
+    assert profiler._would_keep(10)
+    profiler.kept_traces = [(12, 0, 'a'), (30, 1, 'b')]
+    assert not profiler._would_keep(11)
+    assert profiler._would_keep(13)
+    assert not VenueProfiler(str(tmp_path), slow_threshold=10, keep_traces=0)._would_keep(60)
+
+
+def test_keeps_only_slowest_traces(tmp_path, clock):
+    profiler = make_profiler(tmp_path, FakeTracing())
+
+    for n, seconds in enumerate([15, 3, 40, 25]):
+        time_venue(profiler, clock, f'https://www.bringfido.ca/lodging/{n}', seconds)
+    profiler.python_profile.disable()
+
+    by_url = {venue['url'].rsplit('/', 1)[1]: venue for venue in profiler.venues}
+    assert 'trace' not in by_url['0'] and 'trace' not in by_url['1']
+    assert os.path.exists(by_url['2']['trace']) and os.path.exists(by_url['3']['trace'])
+    assert sorted(os.listdir(profiler.traces_dir)) == ['00002_lodging_2.zip', '00003_lodging_3.zip']
+
+
+def test_tracing_errors_never_lose_the_venue(tmp_path, clock):
+    profiler = make_profiler(tmp_path, FakeTracing(fail_on={'stop_chunk'}))
+    time_venue(profiler, clock, 'https://www.bringfido.ca/lodging/1', 30)
+
+    profiler.context.tracing.fail_on = {'start_chunk'}
+    with pytest.raises(TimeoutError):
+        with profiler.venue('https://www.bringfido.ca/lodging/2'):
+            clock.now += 45
+            raise TimeoutError('page.goto timed out')
+    profiler.python_profile.disable()
+
+    assert [venue['seconds'] for venue in profiler.venues] == [30, 45]
+    assert profiler.venues[1]['failed'] and 'timed out' in profiler.venues[1]['error']
+    assert not any('trace' in venue for venue in profiler.venues)
+    assert profiler.kept_traces == []
+
+
+def test_attach_without_tracing_still_times_venues(tmp_path, clock):
+    profiler = make_profiler(tmp_path, FakeTracing(fail_on={'start'}))
+    time_venue(profiler, clock, 'https://www.bringfido.ca/lodging/1', 30)
+    profiler.python_profile.disable()
+
+    assert profiler.context is None
+    assert profiler.venues[0]['seconds'] == 30
+
+
+def test_report_ranks_slowest_venues(tmp_path, clock):
+    profiler = make_profiler(tmp_path, FakeTracing(), keep_traces=1)
+    for n, seconds in enumerate([12, 50, 2]):
+        time_venue(profiler, clock, f'https://www.bringfido.ca/restaurant/{n}', seconds)
+
+    report_path = profiler.finish()
+
+    with open(report_path, encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['venues_timed'] == 3
+    assert report['slow_venues'] == 2
+    assert [venue['seconds'] for venue in report['slowest']] == [50, 12, 2]
+    assert report['slowest'][0]['trace'].endswith('00001_restaurant_1.zip')
+    assert os.path.exists(report['python_profile'])
+
+    with open(os.path.join(profiler.output_dir, 'slow_venues_report.txt'), encoding='utf-8') as f:
+        text = f.read()
+    assert text.index('restaurant/1') < text.index('restaurant/0') < text.index('restaurant/2')
+    assert 'trace: ' in text
@@ -0,0 +1,211 @@
+"""
+Opt-in profiling for production scrapes
+Profiles the Python side with cProfile, records a Playwright trace chunk per venue and keeps only the
+slowest N traces, then writes a report ranking the slowest URLs and what each was waiting on
+"""
+
+import cProfile
+import heapq
+import io
+import json
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_THRESHOLD = 20.0
+DEFAULT_KEEP_TRACES = 10
+
+# Requests listed per venue in the report
+TOP_REQUESTS = 5
+
+
+def _request_duration_ms(request):
+    """Total request time from Playwright's resource timing, or -1 when unknown"""
+    try:
+        timing = request.timing
+    except Exception:
+        return -1
+    if not timing or timing.get('responseEnd', -1) < 0:
+        return -1
+    return timing['responseEnd']
+
+
+class VenueProfiler:
+    def __init__(self, output_dir, slow_threshold=DEFAULT_SLOW_THRESHOLD, keep_traces=DEFAULT_KEEP_TRACES):
+        self.output_dir = output_dir
+        self.traces_dir = os.path.join(output_dir, 'traces')
+        self.slow_threshold = slow_threshold
+        self.keep_traces = keep_traces
+
+        self.python_profile = cProfile.Profile()
+        self.context = None
+        self.venues = []       # every timed venue, for the report
+        self.kept_traces = []  # min-heap of (elapsed, sequence, trace path)
+
+        # Network activity for the venue currently being timed
+        self._pending = {}
+        self._requests = []
+
+    def start(self):
+        os.makedirs(self.traces_dir, exist_ok=True)
+        self.python_profile.enable()
+
+    def attach(self, page):
+        """Start tracing the page's browser context and listen to its network events"""
+        try:
+            page.context.tracing.start(screenshots=False, snapshots=True)
+            self.context = page.context
+        except Exception as e:
+            logger.warning(f"Could not start Playwright tracing, timing venues without traces: {e}")
+        page.on('request', self._on_request)
+        page.on('requestfinished', self._on_request_done)
+        page.on('requestfailed', self._on_request_failed)
+
+    def _on_request(self, request):
+        self._pending[id(request)] = (request, time.perf_counter())
+
+    def _on_request_done(self, request, failure=None):
+        entry = self._pending.pop(id(request), None)
+        wall_ms = (time.perf_counter() - entry[1]) * 1000 if entry else -1
+        duration = _request_duration_ms(request)
+        self._requests.append({
+            'url': request.url,
+            'type': request.resource_type,
+            'ms': round(duration if duration >= 0 else wall_ms, 1),
+            'failure': failure,
+        })
+
+    def _on_request_failed(self, request):
+        self._on_request_done(request, failure=request.failure or 'failed')
+
+    def _start_chunk(self, url):
+        """Open a trace chunk for one venue; False when there is no trace to finish"""
+        if self.context is None:
+            return False
+        try:
+            self.context.tracing.start_chunk(title=url)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not start trace for {url}: {e}")
+            return False
+
+    def _would_keep(self, elapsed):
+        if elapsed < self.slow_threshold or self.keep_traces <= 0:
+            return False
+        return len(self.kept_traces) < self.keep_traces or elapsed > self.kept_traces[0][0]
+
+    @contextmanager
+    def venue(self, url):
+        """Time one venue; the yielded dict can be marked {'failed': True} by the caller.
+        Tracing problems are logged, never raised - profiling must not cost the crawl any data."""
+        record = {'url': url, 'failed': False}
+        self._pending.clear()
+        self._requests = []
+        tracing = self._start_chunk(url)
+
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['failed'] = True
+            record['error'] = str(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            record['seconds'] = round(elapsed, 2)
+            # Anything still in flight is what networkidle (or the timeout) was waiting for
+            record['pending'] = [
+                {'url': request.url, 'type': request.resource_type,
+                 'ms': round((time.perf_counter() - started) * 1000, 1)}
+                for request, started in self._pending.values()
+            ]
+            record['slowest_requests'] = sorted(self._requests, key=lambda r: r['ms'], reverse=True)[:TOP_REQUESTS]
+            record['request_count'] = len(self._requests)
+            if tracing:
+                self._finish_trace(record, elapsed)
+            self.venues.append(record)
+
+            if elapsed >= self.slow_threshold:
+                logger.warning(f"🐢 Slow venue ({elapsed:.1f}s): {url}")
+
+    def _finish_trace(self, record, elapsed):
+        """Save this venue's trace chunk only if it ranks among the slowest N"""
+        # A slow venue is exactly when the page is likely broken, so stopping the chunk may fail too
+        try:
+            if not self._would_keep(elapsed):
+                self.context.tracing.stop_chunk()
+                return
+
+            slug = urlsplit(record['url']).path.strip('/').replace('/', '_') or 'venue'
+            trace_path = os.path.join(self.traces_dir, f"{len(self.venues):05d}_{slug}.zip")
+            self.context.tracing.stop_chunk(path=trace_path)
+        except Exception as e:
+            logger.warning(f"Could not save trace for {record['url']}: {e}")
+            return
+        record['trace'] = trace_path
+
+        heapq.heappush(self.kept_traces, (elapsed, len(self.venues), trace_path))
+        if len(self.kept_traces) > self.keep_traces:
+            _, _, evicted = heapq.heappop(self.kept_traces)
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+            for venue in self.venues:
+                if venue.get('trace') == evicted:
+                    del venue['trace']
+
+    def finish(self):
+        """Stop profiling and write the pstats dump plus the slow venue report"""
+        self.python_profile.disable()
+        if self.context is not None:
+            try:
+                self.context.tracing.stop()
+            except Exception as e:
+                logger.debug(f"Could not stop tracing: {e}")
+
+        stats_path = os.path.join(self.output_dir, 'python_profile.pstats')
+        self.python_profile.dump_stats(stats_path)
+
+        ranked = sorted(self.venues, key=lambda venue: venue['seconds'], reverse=True)
+        report = {
+            'venues_timed': len(self.venues),
+            'slow_threshold_seconds': self.slow_threshold,
+            'slow_venues': sum(1 for venue in self.venues if venue['seconds'] >= self.slow_threshold),
+            'python_profile': stats_path,
+            'slowest': ranked[:max(self.keep_traces, 25)],
+        }
+        report_path = os.path.join(self.output_dir, 'slow_venues_report.json')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        text_path = os.path.join(self.output_dir, 'slow_venues_report.txt')
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(self.format_report(ranked))
+
+        logger.info(f"📈 Profiling report: {text_path}")
+        return report_path
+
+    def format_report(self, ranked):
+        lines = [f"Slowest venues ({len(self.venues)} timed, threshold {self.slow_threshold:.0f}s)", '']
+        for rank, venue in enumerate(ranked[:25], 1):
+            status = ' FAILED' if venue['failed'] else ''
+            lines.append(f"{rank:2d}. {venue['seconds']:7.1f}s{status}  {venue['url']}")
+            if venue.get('trace'):
+                lines.append(f"      trace: {venue['trace']}  (npx playwright show-trace <file>)")
+            for request in venue['pending']:
+                lines.append(f"      still pending {request['ms']:8.0f} ms  [{request['type']}] {request['url']}")
+            for request in venue['slowest_requests']:
+                failure = f" ({request['failure']})" if request['failure'] else ''
+                lines.append(f"      {request['ms']:8.0f} ms  [{request['type']}] {request['url']}{failure}")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self.python_profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(20)
+        lines += ['', 'Python time (top 20 by cumulative time)', stream.getvalue()]
+        return '\n'.join(lines) + '\n'